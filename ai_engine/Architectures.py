@@ -0,0 +1,177 @@
+# ai_engine/Architectures.py
+"""
+Registry of model architectures for StrategyGenerator, plus a selection
+step that trades validation accuracy against CPU inference latency.
+
+Every builder takes the (window, features) input shape and returns an
+uncompiled Keras model with a 3-way softmax (Buy/Sell/Hold).
+"""
+import logging
+import statistics
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import tensorflow as tf
+
+ARCHITECTURES: Dict[str, Callable[[Tuple[int, int]], tf.keras.Model]] = {}
+_SERVING: "weakref.WeakKeyDictionary[tf.keras.Model, Callable]" = weakref.WeakKeyDictionary()
+
+
+def register_architecture(name: str):
+    """Decorator adding a builder to ARCHITECTURES under `name`."""
+    def register(builder: Callable[[Tuple[int, int]], tf.keras.Model]):
+        ARCHITECTURES[name] = builder
+        return builder
+    return register
+
+
+@register_architecture("lstm_deep")
+def _lstm_deep(input_shape: Tuple[int, int]) -> tf.keras.Model:
+    return tf.keras.Sequential([
+        tf.keras.Input(shape=input_shape),
+        tf.keras.layers.LSTM(256, return_sequences=True),
+        tf.keras.layers.Dropout(0.4),
+        tf.keras.layers.LSTM(128),
+        tf.keras.layers.Dense(64, activation="relu"),
+        tf.keras.layers.Dense(3, activation="softmax"),
+    ])
+
+
+@register_architecture("lstm_small")
+def _lstm_small(input_shape: Tuple[int, int]) -> tf.keras.Model:
+    return tf.keras.Sequential([
+        tf.keras.Input(shape=input_shape),
+        tf.keras.layers.LSTM(32),
+        tf.keras.layers.Dense(3, activation="softmax"),
+    ])
+
+
+@register_architecture("gru_small")
+def _gru_small(input_shape: Tuple[int, int]) -> tf.keras.Model:
+    return tf.keras.Sequential([
+        tf.keras.Input(shape=input_shape),
+        tf.keras.layers.GRU(32),
+        tf.keras.layers.Dense(3, activation="softmax"),
+    ])
+
+
+@register_architecture("tcn")
+def _tcn(input_shape: Tuple[int, int]) -> tf.keras.Model:
+    """Dilated causal 1-D convolutions; receptive field 1 + 2*(1+2+4) = 15 bars."""
+    layers: List[tf.keras.layers.Layer] = [tf.keras.Input(shape=input_shape)]
+    for dilation in (1, 2, 4):
+        layers.append(tf.keras.layers.Conv1D(16, kernel_size=3, padding="causal",
+                                             dilation_rate=dilation, activation="relu"))
+    layers += [
+        tf.keras.layers.GlobalAveragePooling1D(),
+        tf.keras.layers.Dense(3, activation="softmax"),
+    ]
+    return tf.keras.Sequential(layers)
+
+
+@register_architecture("linear")
+def _linear(input_shape: Tuple[int, int]) -> tf.keras.Model:
+    return tf.keras.Sequential([
+        tf.keras.Input(shape=input_shape),
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(3, activation="softmax"),
+    ])
+
+
+def build_architecture(name: str, input_shape: Tuple[int, int]) -> tf.keras.Model:
+    """Build and compile the registered architecture `name`."""
+    try:
+        builder = ARCHITECTURES[name]
+    except KeyError:
+        raise ValueError(f"Unknown architecture '{name}'; known: {sorted(ARCHITECTURES)}")
+    model = builder(input_shape)
+    model.compile(optimizer="adam", loss="categorical_crossentropy", metrics=["accuracy"])
+    return model
+
+
+def serving_fn(model: tf.keras.Model) -> Callable[[Any], np.ndarray]:
+    """
+    Graph-compiled inference function for `model`, traced once per model.
+    Unlike Model.predict it builds no data pipeline per call, and unlike an
+    eager call it does not step recurrent layers in Python. Multi-input
+    models take a dict of arrays keyed by input name.
+
+    The function reaches the model through a weak reference, so the cache
+    entry (and its traced graph) goes away with the model.
+    """
+    fn = _SERVING.get(model)
+    if fn is not None:
+        return fn
+    ref = weakref.ref(model)
+    if len(model.inputs) > 1:
+        spec = {inp.name: tf.TensorSpec((None,) + tuple(inp.shape[1:]), tf.float32)
+                for inp in model.inputs}
+        graph = tf.function(lambda x: ref()(x, training=False), input_signature=[spec])
+
+        def fn(x):
+            return graph({name: tf.convert_to_tensor(x[name], tf.float32) for name in spec}).numpy()
+    else:
+        spec = tf.TensorSpec((None,) + tuple(model.inputs[0].shape[1:]), tf.float32)
+        graph = tf.function(lambda x: ref()(x, training=False), input_signature=[spec])
+
+        def fn(x):
+            return graph(tf.convert_to_tensor(x, tf.float32)).numpy()
+    _SERVING[model] = fn
+    return fn
+
+
+def measure_latency_ms(model: tf.keras.Model, sample: np.ndarray, runs: int = 30) -> float:
+    """Median wall time of one single-window prediction, as served by StrategyGenerator.predict."""
+    fn = serving_fn(model)
+    x = np.asarray(sample, dtype=np.float32)[None, ...]
+    fn(x)  # trace
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(x)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e3
+
+
+def select_architecture(
+        X: np.ndarray,
+        y: np.ndarray,
+        latency_budget_ms: Optional[float],
+        candidates: Optional[Sequence[str]] = None,
+        epochs: int = 5,
+        validation_split: float = 0.2,
+        logger: Optional[logging.Logger] = None,
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Train every candidate briefly on the oldest (1 - validation_split) of the
+    samples and score it on the newest part. Returns the most accurate
+    architecture whose latency fits the budget (ties go to the faster one),
+    or the fastest one if none fits, along with the per-candidate report.
+    """
+    logger = logger or logging.getLogger("StrategyGenerator")
+    split = int(len(X) * (1.0 - validation_split))
+    X_train, y_train, X_val, y_val = X[:split], y[:split], X[split:], y[split:]
+
+    report = []
+    for name in candidates or sorted(ARCHITECTURES):
+        model = build_architecture(name, (X.shape[1], X.shape[2]))
+        start = time.perf_counter()
+        model.fit(X_train, y_train, epochs=epochs, batch_size=64, verbose=0)
+        train_s = time.perf_counter() - start
+        _, accuracy = model.evaluate(X_val, y_val, verbose=0)
+        latency = measure_latency_ms(model, X_val[-1])
+        report.append({"name": name, "val_accuracy": float(accuracy),
+                       "latency_ms": latency, "train_seconds": train_s})
+        logger.info("Candidate %-10s acc=%.3f latency=%.2fms train=%.1fs",
+                    name, accuracy, latency, train_s)
+
+    fitting = [r for r in report if latency_budget_ms is None or r["latency_ms"] <= latency_budget_ms]
+    if fitting:
+        best = max(fitting, key=lambda r: (r["val_accuracy"], -r["latency_ms"]))
+    else:
+        best = min(report, key=lambda r: r["latency_ms"])
+        logger.warning("No architecture fits %.2fms budget; using fastest (%s, %.2fms)",
+                       latency_budget_ms, best["name"], best["latency_ms"])
+    return best["name"], report
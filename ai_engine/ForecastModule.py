@@ -1,24 +1,57 @@
 # ---------- ai_engine/ForecastModule.py ----------
 """
 Handles time-series forecasting using pre-trained models.
+
+Only the rows (or windows, for sequence models) needed for the requested
+horizon are fed to the model, after the bundle's feature selection and
+normalization. `forecast_batch` groups requests that share a model object
+into a single forward pass, and results are cached per
+(symbol, timeframe, last bar time) so repeated queries inside one bar are free.
+
+ModelUpdater keeps one model per symbol, so a watchlist of per-symbol models
+still costs one forward pass per symbol; only symbols registered with the
+same model object (e.g. `forecaster.models[s] = shared` for a cross-symbol
+model) share a pass. Each pass avoids Model.predict's per-call overhead:
+bundles load as MappedModel (NumPy on the mapped weights) and other Keras
+models go through Architectures.serving_fn.
 """
 
 import logging
-from typing import Dict, Any, List
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 
 from ai_engine.ModelUpdater import ModelUpdater
 
+# DataFeed/MT5 column names for feature names used at training time
+_COLUMN_ALIASES = {"volume": "tick_volume"}
+
+
+@dataclass
+class ForecastRequest:
+    symbol: str
+    data: Any  # → pd.DataFrame or np.ndarray
+    periods: int = 10
+    timeframe: Optional[int] = None
+    bar_time: Any = None  # defaults to data["time"][-1] for DataFrames
+
 
 class ForecastModule:
-    def __init__(self, model_updater: ModelUpdater) -> None:
+    def __init__(self, model_updater: ModelUpdater, cache_size: int = 1024) -> None:
         """
         model_updater: used to load/save symbol-specific models.
+        cache_size: max number of (symbol, timeframe, bar) results kept.
         """
         self.model_updater = model_updater
         self.models: Dict[str, Any] = {}
+        self.features: Dict[str, List[str]] = {}  # from bundle metadata, if any
+        self.scalers: Dict[str, Any] = {}  # from bundle normalization, if any
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, List[float]]" = OrderedDict()
         self.logger = logging.getLogger("ForecastModule")
         if not self.logger.handlers:
             handler = logging.StreamHandler()
@@ -36,37 +69,158 @@ class ForecastModule:
         model = self.model_updater.load_model(symbol)
         if model is not None:
             self.models[symbol] = model
+            bundle = self.model_updater.load_bundle(symbol)
+            if bundle is not None and bundle.metadata.get("features"):
+                self.features[symbol] = list(bundle.metadata["features"])
+            if bundle is not None and bundle.normalization.get("type") == "minmax":
+                from ai_engine.StrategyGenerator import scaler_from_state
+                self.scalers[symbol] = scaler_from_state(bundle.normalization)
             return True
         return False
 
+    def _get_model(self, symbol: str) -> Any:
+        model = self.models.get(symbol)
+        if model is None:
+            # try loading if not in memory
+            if not self.load_model(symbol):
+                self.logger.error("No model found for symbol %s", symbol)
+                return None
+            model = self.models[symbol]
+        return model
+
+    @staticmethod
+    def _to_array(data: Any, features: Optional[Sequence[str]] = None, scaler: Any = None) -> np.ndarray:
+        """
+        Model input matrix. DataFrames are reduced to the model's feature
+        columns when known, otherwise to their numeric columns (so the `time`
+        column used for caching never reaches the model). With `scaler`, the
+        features are normalized as they were at training time.
+        """
+        if isinstance(data, pd.DataFrame):
+            if features:
+                columns = [f if f in data.columns else _COLUMN_ALIASES.get(f, f) for f in features]
+                arr = data[columns].to_numpy(dtype=np.float32)
+            else:
+                arr = data.drop(columns="time", errors="ignore") \
+                    .select_dtypes(include="number").to_numpy(dtype=np.float32)
+        else:
+            arr = np.asarray(data)
+        if scaler is not None:
+            arr = scaler.transform(arr).astype(np.float32)
+        return arr
+
+    @staticmethod
+    def _forward(model: Any, batch: np.ndarray) -> np.ndarray:
+        tf = sys.modules.get("tensorflow")
+        if tf is not None and isinstance(model, tf.keras.Model):
+            from ai_engine.Architectures import serving_fn
+            return serving_fn(model)(batch)
+        return np.asarray(model.predict(batch))
+
+    @staticmethod
+    def _cache_key(req: ForecastRequest) -> Optional[Tuple]:
+        bar_time = req.bar_time
+        if bar_time is None and isinstance(req.data, pd.DataFrame) \
+                and "time" in req.data.columns and len(req.data):
+            bar_time = req.data["time"].iloc[-1]
+        if bar_time is None:
+            return None
+        return req.symbol, req.timeframe, bar_time
+
+    @staticmethod
+    def _model_inputs(model: Any, arr: np.ndarray, periods: int) -> np.ndarray:
+        """
+        Slice out just the inputs that produce the last `periods` outputs.
+        Sequence models (input rank 3) get the last `periods` sliding windows.
+        """
+        shape = getattr(model, "input_shape", None)
+        if isinstance(shape, tuple) and len(shape) == 3 and shape[1]:
+            window = shape[1]
+            tail = arr[-(window + periods - 1):]
+            windows = np.lib.stride_tricks.sliding_window_view(tail, window, axis=0)
+            # sliding_window_view puts the window axis last: (n, features, window)
+            return np.ascontiguousarray(np.swapaxes(windows, 1, 2))
+        return arr[-periods:]
+
+    def _remember(self, key: Tuple, result: List[float]) -> None:
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def forecast_batch(self, requests: Sequence[ForecastRequest]) -> List[List[float]]:
+        """
+        Forecast many (symbol, timeframe, horizon) requests at once.
+
+        Requests for the same bar are deduplicated to the longest horizon,
+        and all requests whose symbols share a model object are run through
+        one forward pass. Returns one list per request, in order.
+        """
+        results: List[Optional[List[float]]] = [None] * len(requests)
+
+        # 1) serve from cache and collapse horizons on the same bar
+        pending: "OrderedDict[Any, Tuple[ForecastRequest, List[int]]]" = OrderedDict()
+        for i, req in enumerate(requests):
+            key = self._cache_key(req)
+            cached = self._cache.get(key) if key is not None else None
+            if cached is not None and len(cached) >= req.periods:
+                results[i] = cached[-req.periods:]
+                continue
+            slot = key if key is not None else ("__uncached__", i)
+            if slot in pending:
+                best, idxs = pending[slot]
+                if req.periods > best.periods:
+                    best = req
+                pending[slot] = (best, idxs + [i])
+            else:
+                pending[slot] = (req, [i])
+
+        # 2) group remaining work by model and run one forward pass per model
+        groups: Dict[int, Tuple[Any, List[Tuple[Any, ForecastRequest, List[int], np.ndarray]]]] = {}
+        for slot, (req, idxs) in pending.items():
+            model = self._get_model(req.symbol)
+            if model is None:
+                for i in idxs:
+                    results[i] = []
+                continue
+            inputs = self._model_inputs(
+                model,
+                self._to_array(req.data, self.features.get(req.symbol), self.scalers.get(req.symbol)),
+                req.periods)
+            groups.setdefault(id(model), (model, []))[1].append((slot, req, idxs, inputs))
+
+        for model, items in groups.values():
+            batch = np.concatenate([inputs for _, _, _, inputs in items], axis=0)
+            preds = self._forward(model, batch)
+            offset = 0
+            for slot, req, idxs, inputs in items:
+                out = preds[offset: offset + len(inputs)].tolist()
+                offset += len(inputs)
+                if slot[0] != "__uncached__":
+                    self._remember(slot, out)
+                for i in idxs:
+                    results[i] = out[-requests[i].periods:]
+            self.logger.debug("Batched forecast: %d requests, %d rows in one pass",
+                              len(items), len(batch))
+
+        return [r if r is not None else [] for r in results]
+
     def forecast(
             self,
             symbol: str,
             data: Any,  # → pd.DataFrame or np.ndarray
-            periods: int = 10
+            periods: int = 10,
+            timeframe: Optional[int] = None,
+            bar_time: Any = None,
     ) -> List[float]:
         """
         Generate a forecast for the next `periods` values of `symbol`
         based on its time-series `data`.
         """
-        # convert DataFrame inputs into NumPy arrays
-        if isinstance(data, pd.DataFrame):
-            arr = data.to_numpy()
-        else:
-            arr = np.asarray(data)
-
-        model = self.models.get(symbol)
-        if model is None:
-            # try loading if not in memory
-            if not self.load_model(symbol):
-                self.logger.error("No model found for symbol %s", symbol)
-                return []
-            model = self.models[symbol]
-
-        # assume model.predict accepts arr of shape (n_samples, n_features)
-        preds = model.predict(arr)
-        result = preds[-periods:].tolist()
-        self.logger.info("Forecast for %s: %s", symbol, result)
+        result = self.forecast_batch(
+            [ForecastRequest(symbol, data, periods, timeframe, bar_time)]
+        )[0]
+        self.logger.debug("Forecast for %s: %s", symbol, result)
         return result
 
     # alias so TradingEngine.predict() still works if desired
@@ -0,0 +1,182 @@
+# ---------- ai_engine/MappedModel.py ----------
+"""
+NumPy inference for Sequential model bundles, straight from the mmapped weights.
+
+Rebuilding a Keras model from its architecture JSON takes 100+ ms and
+set_weights copies every array into private TF variables. For the layer
+types used by ai_engine/Architectures.py (Dense, LSTM, GRU, causal Conv1D,
+Flatten, Dropout, GlobalAveragePooling1D) the forward pass is a handful of
+matmuls, so MappedModel evaluates it directly on the read-only memmap views:
+loading costs a JSON parse plus an mmap, and every process serving the same
+bundle shares the weight pages through the OS page cache.
+
+Bundles with other layers (e.g. the fused multi-input model) are not
+supported; `MappedModel.from_bundle` returns None for them.
+"""
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ai_engine.ModelBundle import ModelBundle
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+_ACTIVATIONS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "tanh": np.tanh,
+    "sigmoid": _sigmoid,
+    "softmax": _softmax,
+}
+
+# layer class -> number of weight arrays it owns (with use_bias=True)
+_WEIGHT_COUNTS = {"Dense": 2, "LSTM": 3, "GRU": 3, "Conv1D": 2,
+                  "Flatten": 0, "Dropout": 0, "GlobalAveragePooling1D": 0, "InputLayer": 0}
+
+
+def _dense(cfg, w, x):
+    y = x @ w[0]
+    if cfg.get("use_bias", True):
+        y = y + w[1]
+    return _ACTIVATIONS[cfg.get("activation", "linear")](y)
+
+
+def _lstm(cfg, w, x):
+    kernel, recurrent, bias = w
+    units = recurrent.shape[0]
+    act = _ACTIVATIONS[cfg.get("activation", "tanh")]
+    rec_act = _ACTIVATIONS[cfg.get("recurrent_activation", "sigmoid")]
+    xs = x @ kernel + bias  # input projections for all steps at once
+    h = np.zeros((x.shape[0], units), dtype=x.dtype)
+    c = np.zeros_like(h)
+    outputs = []
+    for t in range(x.shape[1]):
+        z = xs[:, t] + h @ recurrent
+        i, f, g, o = z[:, :units], z[:, units:2 * units], z[:, 2 * units:3 * units], z[:, 3 * units:]
+        c = rec_act(f) * c + rec_act(i) * act(g)
+        h = rec_act(o) * act(c)
+        outputs.append(h)
+    return np.stack(outputs, axis=1) if cfg.get("return_sequences") else h
+
+
+def _gru(cfg, w, x):
+    kernel, recurrent, bias = w
+    units = recurrent.shape[0]
+    act = _ACTIVATIONS[cfg.get("activation", "tanh")]
+    rec_act = _ACTIVATIONS[cfg.get("recurrent_activation", "sigmoid")]
+    input_bias, recurrent_bias = (bias[0], bias[1]) if bias.ndim == 2 else (bias, None)
+    xs = x @ kernel + input_bias
+    h = np.zeros((x.shape[0], units), dtype=x.dtype)
+    outputs = []
+    for t in range(x.shape[1]):
+        xz, xr, xh = xs[:, t, :units], xs[:, t, units:2 * units], xs[:, t, 2 * units:]
+        if cfg.get("reset_after", True):
+            hs = h @ recurrent + recurrent_bias
+            z = rec_act(xz + hs[:, :units])
+            r = rec_act(xr + hs[:, units:2 * units])
+            hh = act(xh + r * hs[:, 2 * units:])
+        else:
+            z = rec_act(xz + h @ recurrent[:, :units])
+            r = rec_act(xr + h @ recurrent[:, units:2 * units])
+            hh = act(xh + (r * h) @ recurrent[:, 2 * units:])
+        h = z * h + (1.0 - z) * hh
+        outputs.append(h)
+    return np.stack(outputs, axis=1) if cfg.get("return_sequences") else h
+
+
+def _conv1d(cfg, w, x):
+    kernel = w[0]
+    k = kernel.shape[0]
+    dilation = cfg.get("dilation_rate", [1])
+    dilation = dilation[0] if isinstance(dilation, (list, tuple)) else dilation
+    pad = (k - 1) * dilation
+    xp = np.pad(x, ((0, 0), (pad, 0), (0, 0)))
+    steps = x.shape[1]
+    y = sum(xp[:, j * dilation: j * dilation + steps] @ kernel[j] for j in range(k))
+    if cfg.get("use_bias", True):
+        y = y + w[1]
+    return _ACTIVATIONS[cfg.get("activation", "linear")](y)
+
+
+_LAYERS = {
+    "Dense": _dense,
+    "LSTM": _lstm,
+    "GRU": _gru,
+    "Conv1D": _conv1d,
+    "Flatten": lambda cfg, w, x: x.reshape(x.shape[0], -1),
+    "Dropout": lambda cfg, w, x: x,
+    "GlobalAveragePooling1D": lambda cfg, w, x: x.mean(axis=1),
+}
+
+
+def _supported(name: str, cfg: Dict[str, Any]) -> bool:
+    if name not in _WEIGHT_COUNTS:
+        return False
+    if cfg.get("activation", "linear") not in _ACTIVATIONS:
+        return False
+    if name in ("LSTM", "GRU"):
+        return (not cfg.get("go_backwards") and not cfg.get("stateful")
+                and cfg.get("use_bias", True)
+                and cfg.get("recurrent_activation", "sigmoid") in _ACTIVATIONS)
+    if name == "Conv1D":
+        strides = cfg.get("strides", [1])
+        return cfg.get("padding") == "causal" and list(np.atleast_1d(strides)) == [1] \
+            and cfg.get("data_format", "channels_last") == "channels_last"
+    if name == "GlobalAveragePooling1D":
+        return not cfg.get("keepdims") and cfg.get("data_format", "channels_last") == "channels_last"
+    return True
+
+
+class MappedModel:
+    """Read-only Sequential model evaluated in NumPy on memory-mapped weights."""
+
+    def __init__(self, layers: List[Tuple[str, Dict[str, Any], List[np.ndarray]]],
+                 input_shape: Tuple[Optional[int], ...]) -> None:
+        self.layers = layers
+        self.input_shape = input_shape
+
+    @classmethod
+    def from_bundle(cls, bundle: ModelBundle) -> Optional["MappedModel"]:
+        """Build from a bundle, or None if its architecture is not supported."""
+        if not bundle.architecture:
+            return None
+        arch = json.loads(bundle.architecture)
+        if arch.get("class_name") != "Sequential":
+            return None
+        specs = arch["config"]["layers"]
+        input_shape = None
+        layers = []
+        weights = iter(bundle.weights)
+        for spec in specs:
+            name, cfg = spec["class_name"], spec["config"]
+            shape = cfg.get("batch_shape") or cfg.get("batch_input_shape")
+            if shape is not None and input_shape is None:
+                input_shape = tuple(shape)
+            if not _supported(name, cfg):
+                return None
+            if name == "InputLayer":
+                continue
+            count = _WEIGHT_COUNTS[name]
+            if name in ("Dense", "Conv1D") and not cfg.get("use_bias", True):
+                count -= 1
+            layers.append((name, cfg, [next(weights) for _ in range(count)]))
+        if input_shape is None or next(weights, None) is not None:
+            return None
+        return cls(layers, input_shape)
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        out = np.asarray(x, dtype=np.float32)
+        for name, cfg, w in self.layers:
+            out = _LAYERS[name](cfg, w, out)
+        return out
+
+    __call__ = predict
@@ -0,0 +1,175 @@
+# ---------- ai_engine/ModelBundle.py ----------
+"""
+Versioned on-disk model bundle: raw weight arrays plus a JSON manifest.
+
+Layout of a bundle directory (one per symbol):
+
+    models/<symbol>/manifest.json          architecture, normalization, schema, hashes
+    models/<symbol>/weights-<sha12>.bin    all weight arrays, 64-byte aligned, back to back
+
+The weights file is memory-mapped on load, so opening a bundle costs a JSON
+parse plus an mmap (well under a millisecond) and readers of the raw arrays
+share the pages through the OS page cache (see ai_engine/MappedModel.py for
+inference on those views). Writes are atomic: the weights file is
+content-addressed and written first, then the manifest is swapped in with
+os.replace(), which is the single commit point. The previous generation's
+weights file is kept, so a reader holding the old manifest can still map it.
+"""
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from utils.atomic_io import atomic_write_bytes
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+_ALIGNMENT = 64
+
+
+@dataclass
+class ModelBundle:
+    """In-memory view of a bundle. `weights` are read-only memmap views."""
+    manifest: Dict[str, Any]
+    weights: List[np.ndarray] = field(default_factory=list)
+
+    @property
+    def architecture(self) -> Optional[str]:
+        return self.manifest.get("architecture")
+
+    @property
+    def normalization(self) -> Dict[str, Any]:
+        return self.manifest.get("normalization") or {}
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.manifest.get("metadata") or {}
+
+    @property
+    def content_hash(self) -> str:
+        return self.manifest["weights"]["sha256"]
+
+
+def _pack_weights(weights: List[np.ndarray]):
+    """Concatenate arrays into one aligned buffer; return (buffer, layout)."""
+    layout = []
+    chunks = []
+    offset = 0
+    for w in weights:
+        arr = np.ascontiguousarray(w)
+        pad = (-offset) % _ALIGNMENT
+        if pad:
+            chunks.append(b"\0" * pad)
+            offset += pad
+        layout.append({
+            "offset": offset,
+            "shape": list(arr.shape),
+            "dtype": arr.dtype.str,
+        })
+        chunks.append(arr.tobytes())
+        offset += arr.nbytes
+    return b"".join(chunks), layout
+
+
+def write_bundle(
+        bundle_dir: str,
+        weights: List[np.ndarray],
+        architecture: Optional[str] = None,
+        normalization: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Atomically write a bundle to `bundle_dir` and return its manifest.
+    Weight files older than the previous generation are removed once the
+    new manifest is committed.
+    """
+    os.makedirs(bundle_dir, exist_ok=True)
+    try:
+        previous = read_manifest(bundle_dir)
+    except ValueError:
+        previous = None
+    keep = {previous["weights"]["file"]} if previous else set()
+    payload, layout = _pack_weights(weights)
+    digest = hashlib.sha256(payload).hexdigest()
+    weights_name = f"weights-{digest[:12]}.bin"
+    weights_path = os.path.join(bundle_dir, weights_name)
+    if not os.path.exists(weights_path):
+        atomic_write_bytes(weights_path, payload)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "created_at": time.time(),
+        "architecture": architecture,
+        "normalization": normalization or {},
+        "metadata": metadata or {},
+        "weights": {
+            "file": weights_name,
+            "sha256": digest,
+            "nbytes": len(payload),
+            "arrays": layout,
+        },
+    }
+    atomic_write_bytes(
+        os.path.join(bundle_dir, MANIFEST_NAME),
+        json.dumps(manifest, indent=1).encode("utf-8"),
+    )
+
+    for name in os.listdir(bundle_dir):
+        if name.startswith("weights-") and name != weights_name and name not in keep:
+            try:
+                os.unlink(os.path.join(bundle_dir, name))
+            except OSError:
+                pass  # a concurrent reader on Windows may still hold it open
+    return manifest
+
+
+def read_manifest(bundle_dir: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(bundle_dir, MANIFEST_NAME)
+    try:
+        with open(path, "rb") as f:
+            manifest = json.loads(f.read())
+    except FileNotFoundError:
+        return None
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported bundle format {manifest.get('format_version')} in {path}"
+        )
+    return manifest
+
+
+def read_bundle(bundle_dir: str, verify: bool = False) -> Optional[ModelBundle]:
+    """
+    Open the bundle in `bundle_dir`, memory-mapping its weights.
+    Returns None if no bundle exists. With `verify`, the weights are hashed
+    and compared against the manifest (touches every page).
+    """
+    for attempt in range(3):
+        manifest = read_manifest(bundle_dir)
+        if manifest is None:
+            return None
+        info = manifest["weights"]
+        path = os.path.join(bundle_dir, info["file"])
+        if info["nbytes"] == 0:
+            return ModelBundle(manifest=manifest, weights=[])
+        try:
+            mm = np.memmap(path, dtype=np.uint8, mode="r", shape=(info["nbytes"],))
+            break
+        except FileNotFoundError:
+            # replaced by two newer writes since we read the manifest
+            if attempt == 2:
+                raise
+    if verify and hashlib.sha256(mm).hexdigest() != info["sha256"]:
+        raise ValueError(f"Weights hash mismatch for bundle {bundle_dir}")
+
+    weights = []
+    for entry in info["arrays"]:
+        dtype = np.dtype(entry["dtype"])
+        shape = tuple(entry["shape"])
+        weights.append(
+            np.ndarray(shape, dtype=dtype, buffer=mm, offset=entry["offset"])
+        )
+    return ModelBundle(manifest=manifest, weights=weights)
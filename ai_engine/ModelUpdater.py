@@ -1,12 +1,29 @@
 # ---------- ai_engine/ModelUpdater.py ----------
 """
 Updates and persists models based on new data.
+
+Keras models are stored as versioned bundles (see ai_engine/ModelBundle.py):
+a memory-mappable weights file plus a manifest with architecture,
+normalization state, feature schema and training range. Other models
+(e.g. scikit-learn estimators) and bundles written by older versions fall
+back to the legacy `{symbol}_model.pkl` joblib format.
+
+Sequential bundles built from ai_engine/Architectures.py load as
+MappedModel: NumPy inference directly on the memory-mapped weights, so a
+cold load is a JSON parse plus an mmap (well under a millisecond) and
+processes share the weight pages. Other bundles (the fused multi-input
+model) are rebuilt as Keras models, which costs 100+ ms and copies the
+weights; those are cached per bundle content hash.
 """
 import logging
-from typing import Dict, Any
+import os
+from typing import Dict, Any, Optional
 
 import joblib
 
+from ai_engine.MappedModel import MappedModel
+from ai_engine.ModelBundle import ModelBundle, read_bundle, write_bundle
+
 
 class ModelUpdater:
     def __init__(self, save_dir: str) -> None:
@@ -19,14 +36,64 @@ class ModelUpdater:
             )
             self.logger.addHandler(handler)
             self.logger.setLevel(logging.INFO)
+        self._built: Dict[str, Any] = {}  # symbol -> (content hash, model)
+
+    def _bundle_dir(self, symbol: str) -> str:
+        return os.path.join(self.save_dir, symbol)
+
+    def _legacy_path(self, symbol: str) -> str:
+        return f"{self.save_dir}/{symbol}_model.pkl"
 
-    def save_model(self, symbol: str, model: Any) -> None:
-        path = f"{self.save_dir}/{symbol}_model.pkl"
+    def save_model(
+            self,
+            symbol: str,
+            model: Any,
+            normalization: Optional[Dict[str, Any]] = None,
+            metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Persist `model` for `symbol`. `normalization` is the scaler state needed
+        to reproduce the inputs; `metadata` carries the feature schema, window
+        size and training range.
+        """
+        if hasattr(model, "get_weights") and hasattr(model, "to_json"):
+            manifest = write_bundle(
+                self._bundle_dir(symbol),
+                weights=model.get_weights(),
+                architecture=model.to_json(),
+                normalization=normalization,
+                metadata=metadata,
+            )
+            self._built[symbol] = (manifest["weights"]["sha256"], model)
+            self.logger.info("Model bundle saved to %s (sha256 %s)",
+                             self._bundle_dir(symbol), manifest["weights"]["sha256"][:12])
+            return
+        path = self._legacy_path(symbol)
         joblib.dump(model, path)
         self.logger.info("Model saved to %s", path)
 
+    def load_bundle(self, symbol: str, verify: bool = False) -> Optional[ModelBundle]:
+        """Return the raw bundle (manifest + memory-mapped weights) for `symbol`."""
+        return read_bundle(self._bundle_dir(symbol), verify=verify)
+
     def load_model(self, symbol: str) -> Any:
-        path = f"{self.save_dir}/{symbol}_model.pkl"
+        bundle = self.load_bundle(symbol)
+        if bundle is not None:
+            cached = self._built.get(symbol)
+            if cached is not None and cached[0] == bundle.content_hash:
+                return cached[1]
+            mapped = MappedModel.from_bundle(bundle)
+            if mapped is not None:
+                self.logger.info("Model bundle mapped from %s", self._bundle_dir(symbol))
+                return mapped
+            import tensorflow as tf
+            model = tf.keras.models.model_from_json(bundle.architecture)
+            model.set_weights(bundle.weights)
+            self._built[symbol] = (bundle.content_hash, model)
+            self.logger.info("Model bundle loaded from %s", self._bundle_dir(symbol))
+            return model
+
+        path = self._legacy_path(symbol)
         try:
             model = joblib.load(path)
             self.logger.info("Model loaded from %s", path)
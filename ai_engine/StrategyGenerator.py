@@ -1,11 +1,15 @@
 # ai_engine/StrategyGenerator.py
 
 import logging
-from typing import Dict, Tuple, Any, Optional
+import time
+from typing import Dict, Tuple, Any, Optional, Sequence
 import numpy as np
 import tensorflow as tf
 from sklearn.preprocessing import MinMaxScaler
 from ai_engine.ModelUpdater import ModelUpdater  # for saving/loading
+from ai_engine.Architectures import (
+    build_architecture, measure_latency_ms, select_architecture, serving_fn)
+from utils.timeframes import timeframe_minutes, to_epoch_seconds
 
 def setup_logger() -> logging.Logger:
     logger = logging.getLogger("StrategyGenerator")
@@ -16,12 +20,60 @@ def setup_logger() -> logging.Logger:
         logger.setLevel(logging.INFO)
     return logger
 
+FEATURES = ("close", "volume")
+
+
+def scaler_state(scaler: MinMaxScaler) -> Dict[str, Any]:
+    """JSON-serialisable state of a fitted MinMaxScaler (for model bundles)."""
+    return {
+        "type": "minmax",
+        "feature_range": list(scaler.feature_range),
+        "data_min": scaler.data_min_.tolist(),
+        "data_max": scaler.data_max_.tolist(),
+    }
+
+
+def scaler_from_state(state: Dict[str, Any]) -> MinMaxScaler:
+    """Rebuild a fitted MinMaxScaler from `scaler_state` output."""
+    scaler = MinMaxScaler(feature_range=tuple(state["feature_range"]))
+    # partial_fit on the stored min/max rows reproduces the fitted attributes
+    scaler.partial_fit(np.array([state["data_min"], state["data_max"]], dtype=float))
+    return scaler
+
+
+def _time_bound(values: Any, index: int) -> Optional[str]:
+    if values is None or len(values) == 0:
+        return None
+    return str(np.asarray(values)[index].astype("datetime64[s]"))
+
+
 class StrategyGenerator:
-    def __init__(self, model_updater: ModelUpdater, window_size: int = 30):
+    def __init__(
+        self,
+        model_updater: ModelUpdater,
+        window_size: int = 30,
+        architecture: str = "lstm_deep",
+        latency_budget_ms: Optional[float] = None,
+        candidates: Optional[Sequence[str]] = None,
+        selection_epochs: int = 5,
+    ):
+        """
+        architecture: registered name from ai_engine.Architectures, or "auto"
+            to pick one per symbol at training time
+        latency_budget_ms: max single-prediction latency allowed for "auto"
+        candidates: architectures "auto" chooses from (default: all registered)
+        selection_epochs: epochs each candidate is trained for during selection
+        """
         self.model_updater = model_updater
         self.window_size = window_size
+        self.architecture = architecture
+        self.latency_budget_ms = latency_budget_ms
+        self.candidates = candidates
+        self.selection_epochs = selection_epochs
         self.model_registry: Dict[str, tf.keras.Model] = {}
         self.scaler = MinMaxScaler()
+        self.scalers: Dict[str, MinMaxScaler] = {}
+        self.fused_scalers: Dict[str, Dict[int, MinMaxScaler]] = {}
         self.logger = setup_logger()
 
     def _preprocess_data(
@@ -43,26 +95,46 @@ class StrategyGenerator:
                 y.append([0, 0, 1])   # Hold
         return np.array(X), np.array(y)
 
-    def create_deep_model(self, input_shape: Tuple[int, int]) -> tf.keras.Model:
-        model = tf.keras.Sequential([
-            tf.keras.layers.LSTM(256, return_sequences=True, input_shape=input_shape),
-            tf.keras.layers.Dropout(0.4),
-            tf.keras.layers.LSTM(128),
-            tf.keras.layers.Dense(64, activation="relu"),
-            tf.keras.layers.Dense(3, activation="softmax"),
-        ])
-        model.compile(optimizer="adam", loss="categorical_crossentropy", metrics=["accuracy"])
-        self.logger.info("Deep model compiled with input shape %s", input_shape)
+    def create_model(self, architecture: str, input_shape: Tuple[int, int]) -> tf.keras.Model:
+        model = build_architecture(architecture, input_shape)
+        self.logger.info("%s model compiled with input shape %s", architecture, input_shape)
         return model
 
+    def create_deep_model(self, input_shape: Tuple[int, int]) -> tf.keras.Model:
+        return self.create_model("lstm_deep", input_shape)
+
     def train_model(self, symbol: str, data: Dict[str, np.ndarray]) -> None:
         """Train a new model for `symbol` and persist it."""
         X_train, y_train = self._preprocess_data(data)
-        model = self.create_deep_model((X_train.shape[1], X_train.shape[2]))
+        architecture, selection = self.architecture, None
+        if architecture == "auto":
+            architecture, selection = select_architecture(
+                X_train, y_train, self.latency_budget_ms, self.candidates,
+                epochs=self.selection_epochs, logger=self.logger)
+            self.logger.info("Selected %s architecture for %s", architecture, symbol)
+        model = self.create_model(architecture, (X_train.shape[1], X_train.shape[2]))
+        started = time.time()
         model.fit(X_train, y_train, epochs=50, batch_size=64, verbose=1)
+        trained_seconds = time.time() - started
         # register in memory and save to disk
         self.model_registry[symbol] = model
-        self.model_updater.save_model(symbol, model)
+        self.scalers[symbol] = scaler_from_state(scaler_state(self.scaler))
+        self.model_updater.save_model(
+            symbol, model,
+            normalization=scaler_state(self.scaler),
+            metadata={
+                "features": list(FEATURES),
+                "window_size": self.window_size,
+                "train_samples": int(len(X_train)),
+                "train_start": _time_bound(data.get("time"), 0),
+                "train_end": _time_bound(data.get("time"), -1),
+                "trained_at": started,
+                "trained_seconds": trained_seconds,
+                "architecture_name": architecture,
+                "latency_ms": measure_latency_ms(model, X_train[-1]),
+                "selection": selection,
+            },
+        )
         self.logger.info("Trained and saved new model for %s", symbol)
 
     def predict(self, symbol: str, data: Dict[str, np.ndarray]) -> Optional[int]:
@@ -75,6 +147,9 @@ class StrategyGenerator:
             model = self.model_updater.load_model(symbol)  # :contentReference[oaicite:4]{index=4}
             if model is not None:
                 self.model_registry[symbol] = model
+                bundle = self.model_updater.load_bundle(symbol)
+                if bundle is not None and bundle.normalization:
+                    self.scalers[symbol] = scaler_from_state(bundle.normalization)
             else:
                 self.logger.info("No existing model for %s; training new one", symbol)  # :contentReference[oaicite:5]{index=5}
                 self.train_model(symbol, data)                                                   # :contentReference[oaicite:6]{index=6}
@@ -87,11 +162,164 @@ class StrategyGenerator:
         # prepare last window for prediction
         closes = np.asarray(data["close"])
         volumes = np.asarray(data["volume"])
-        scaled = self.scaler.transform(np.stack([closes, volumes], axis=1))
+        scaler = self.scalers.get(symbol, self.scaler)
+        scaled = scaler.transform(np.stack([closes, volumes], axis=1))
         last_window = scaled[-self.window_size:]
-        preds = (model.predict_proba(last_window.reshape(1, -1))
-                 if hasattr(model, "predict_proba")
-                 else model.predict(np.expand_dims(last_window, axis=0)))
+        if hasattr(model, "predict_proba"):
+            preds = model.predict_proba(last_window.reshape(1, -1))
+        elif isinstance(model, tf.keras.Model):
+            preds = serving_fn(model)(last_window[None, ...])
+        else:
+            preds = model.predict(np.expand_dims(last_window, axis=0))
         action = int(np.argmax(preds, axis=1)[0])
         self.logger.info("Prediction for %s: %d (Buy=0/Sell=1/Hold=2)", symbol, action)  # :contentReference[oaicite:7]{index=7}
         return action
+
+    def state_dict(self) -> Dict[str, Any]:
+        """Fitted scalers and the names of loaded models (weights live in their bundles)."""
+        return {
+            "scaler": scaler_state(self.scaler) if hasattr(self.scaler, "data_min_") else None,
+            "scalers": {name: scaler_state(sc) for name, sc in self.scalers.items()},
+            "fused_scalers": {name: {timeframe: scaler_state(sc) for timeframe, sc in scs.items()}
+                              for name, scs in self.fused_scalers.items()},
+            "models": sorted(self.model_registry),
+        }
+
+    def load_state_dict(self, state: Dict[str, Any]) -> None:
+        if state.get("scaler"):
+            self.scaler = scaler_from_state(state["scaler"])
+        self.scalers.update({name: scaler_from_state(st)
+                             for name, st in state.get("scalers", {}).items()})
+        self.fused_scalers.update({name: {int(timeframe): scaler_from_state(st)
+                                          for timeframe, st in scs.items()}
+                                   for name, scs in state.get("fused_scalers", {}).items()})
+        for name in state.get("models", []):
+            if name not in self.model_registry:
+                model = self.model_updater.load_model(name)
+                if model is not None:
+                    self.model_registry[name] = model
+
+    # ----- fused multi-timeframe mode ------------------------------------
+    @staticmethod
+    def fused_key(symbol: str) -> str:
+        """Registry / bundle name of the fused model for `symbol`."""
+        return f"{symbol}_fused"
+
+    def _fused_windows(
+        self,
+        data_by_tf: Dict[int, Dict[str, np.ndarray]],
+        scalers: Dict[int, MinMaxScaler],
+        base_rows: np.ndarray,
+    ) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """
+        Build one time-aligned window per timeframe for each base-timeframe
+        row in `base_rows`. A higher-timeframe bar is only used once it has
+        closed by the end of the base bar, so there is no look-ahead.
+        Rows lacking a full window on any timeframe are dropped; returns
+        ({input name: (n, window, 2)}, kept base rows).
+        """
+        base_tf = min(data_by_tf)
+        base_close = (to_epoch_seconds(data_by_tf[base_tf]["time"])
+                      + timeframe_minutes(base_tf) * 60)[base_rows]
+
+        counts = {}
+        for timeframe, data in data_by_tf.items():
+            if timeframe == base_tf:
+                counts[timeframe] = base_rows + 1
+            else:
+                closes_at = to_epoch_seconds(data["time"]) + timeframe_minutes(timeframe) * 60
+                counts[timeframe] = np.searchsorted(closes_at, base_close, side="right")
+        keep = np.all([c >= self.window_size for c in counts.values()], axis=0)
+
+        offsets = np.arange(self.window_size) - self.window_size
+        inputs = {}
+        for timeframe, data in data_by_tf.items():
+            features = np.stack([np.asarray(data["close"]), np.asarray(data["volume"])], axis=1)
+            scaled = scalers[timeframe].transform(features)
+            inputs[f"m{timeframe}"] = scaled[counts[timeframe][keep, None] + offsets]
+        return inputs, base_rows[keep]
+
+    def create_fused_model(self, timeframes: Tuple[int, ...]) -> tf.keras.Model:
+        """One LSTM branch per timeframe, merged into a single Buy/Sell/Hold head."""
+        inputs, branches = [], []
+        for timeframe in sorted(timeframes):
+            inp = tf.keras.Input(shape=(self.window_size, len(FEATURES)), name=f"m{timeframe}")
+            inputs.append(inp)
+            branches.append(tf.keras.layers.LSTM(64)(inp))
+        x = tf.keras.layers.Concatenate()(branches)
+        x = tf.keras.layers.Dropout(0.3)(x)
+        x = tf.keras.layers.Dense(64, activation="relu")(x)
+        out = tf.keras.layers.Dense(3, activation="softmax")(x)
+        model = tf.keras.Model(inputs=inputs, outputs=out)
+        model.compile(optimizer="adam", loss="categorical_crossentropy", metrics=["accuracy"])
+        self.logger.info("Fused model compiled for timeframes %s", sorted(timeframes))
+        return model
+
+    def train_fused_model(self, symbol: str, data_by_tf: Dict[int, Dict[str, np.ndarray]]) -> None:
+        """Train a fused model on time-aligned windows from every timeframe."""
+        scalers = {}
+        for timeframe, data in data_by_tf.items():
+            scalers[timeframe] = MinMaxScaler().fit(
+                np.stack([np.asarray(data["close"]), np.asarray(data["volume"])], axis=1))
+
+        base_closes = np.asarray(data_by_tf[min(data_by_tf)]["close"])
+        X_train, rows = self._fused_windows(data_by_tf, scalers, np.arange(len(base_closes) - 1))
+        delta = base_closes[rows + 1] - base_closes[rows]
+        y_train = np.eye(3)[np.select([delta > 0, delta < 0], [0, 1], 2)]
+
+        key = self.fused_key(symbol)
+        model = self.create_fused_model(tuple(data_by_tf))
+        started = time.time()
+        model.fit(X_train, y_train, epochs=50, batch_size=64, verbose=1)
+        self.model_registry[key] = model
+        self.fused_scalers[key] = scalers
+        base_times = data_by_tf[min(data_by_tf)].get("time")
+        self.model_updater.save_model(
+            key, model,
+            normalization={"type": "per_input",
+                           "inputs": {str(t): scaler_state(sc) for t, sc in scalers.items()}},
+            metadata={
+                "features": list(FEATURES),
+                "window_size": self.window_size,
+                "timeframes": sorted(data_by_tf),
+                "train_samples": int(len(rows)),
+                "train_start": _time_bound(base_times, 0),
+                "train_end": _time_bound(base_times, -1),
+                "trained_at": started,
+                "trained_seconds": time.time() - started,
+            },
+        )
+        self.logger.info("Trained and saved new fused model for %s", symbol)
+
+    def predict_fused(self, symbol: str, data_by_tf: Dict[int, Dict[str, np.ndarray]]) -> Optional[int]:
+        """
+        Single decision (0=Buy, 1=Sell, 2=Hold) for the latest base-timeframe
+        bar from all timeframes at once. Auto-trains if no fused model exists.
+        """
+        key = self.fused_key(symbol)
+        if key not in self.model_registry:
+            model = self.model_updater.load_model(key)
+            bundle = self.model_updater.load_bundle(key) if model is not None else None
+            if bundle is not None and bundle.normalization.get("type") == "per_input":
+                self.model_registry[key] = model
+                self.fused_scalers[key] = {int(t): scaler_from_state(st)
+                                           for t, st in bundle.normalization["inputs"].items()}
+            else:
+                self.logger.info("No existing fused model for %s; training new one", symbol)
+                self.train_fused_model(symbol, data_by_tf)
+
+        model = self.model_registry.get(key)
+        scalers = self.fused_scalers.get(key)
+        if model is None or scalers is None or set(scalers) != set(data_by_tf):
+            self.logger.error("Failed to obtain fused model for %s", symbol)
+            return None
+
+        last = np.array([len(data_by_tf[min(data_by_tf)]["close"]) - 1])
+        inputs, rows = self._fused_windows(data_by_tf, scalers, last)
+        if len(rows) == 0:
+            self.logger.error("Not enough aligned history for fused prediction on %s", symbol)
+            return None
+        preds = serving_fn(model)(inputs)
+        action = int(np.argmax(preds, axis=1)[0])
+        self.logger.info("Fused prediction for %s: %d (Buy=0/Sell=1/Hold=2)", symbol, action)
+        return action
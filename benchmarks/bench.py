@@ -0,0 +1,465 @@
+# ---------- benchmarks/bench.py ----------
+"""
+Micro and end-to-end benchmarks against the FakeMT5 stand-in.
+
+    python -m benchmarks.bench                    # run, compare with this host's baseline
+    python -m benchmarks.bench --update-baseline  # run and store this host's baseline
+    python -m benchmarks.bench --only run_cycle
+    python -m benchmarks.bench --only run_cycle --update-baseline  # re-record one entry
+
+Each benchmark reports the fastest of several timing rounds, each round
+averaging many calls; the minimum is the estimate least disturbed by other
+load on the machine. A result slower than baseline * (1 + tolerance) is
+re-measured once and is a regression only if it is still slow, which makes
+the process exit with status 1.
+
+Timings only compare on like hardware, so baselines are stored per host
+fingerprint (CPU model, CPU count, Python version; not the hostname, so
+ephemeral CI containers on the same machine type share one) under
+benchmarks/baselines/. A host without a baseline, or a benchmark missing from
+it, is reported and exits with status 3 instead of passing silently.
+Log output is disabled while timing.
+"""
+import argparse
+import http.server
+import json
+import logging
+import os
+import platform
+import re
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import yaml
+
+from broker_interface.Backend import install_backend
+from broker_interface.FakeMT5 import FakeMT5
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "config.yaml")
+SYMBOL = "EURUSD_o"
+
+# name -> setup(); setup returns the zero-argument operation to time
+BENCHMARKS: Dict[str, Callable[[], Callable[[], None]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup: Callable[[], Callable[[], None]]):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _fake() -> FakeMT5:
+    fake = FakeMT5(seed=42)
+    install_backend(fake)
+    fake.initialize()
+    return fake
+
+
+def _market_data(fake: FakeMT5, bars: int = 500) -> Dict[str, np.ndarray]:
+    rates = fake.copy_rates_from_pos(SYMBOL, fake.TIMEFRAME_M1, 0, bars)
+    return {"close": rates["close"], "volume": rates["tick_volume"].astype(float),
+            "time": rates["time"]}
+
+
+def _strategy_generator(data: Dict[str, np.ndarray]):
+    from ai_engine.ModelUpdater import ModelUpdater
+    from ai_engine.StrategyGenerator import StrategyGenerator
+
+    gen = StrategyGenerator(ModelUpdater(tempfile.mkdtemp(prefix="bench-models-")))
+    gen._preprocess_data(data)  # fits the scaler
+    gen.model_registry[SYMBOL] = gen.create_deep_model((gen.window_size, 2))
+    return gen
+
+
+def _load_config() -> dict:
+    with open(CONFIG_PATH, "r") as f:
+        cfg = yaml.safe_load(f)
+    cfg["model"]["path"] = tempfile.mkdtemp(prefix="bench-models-")
+    return cfg
+
+
+@benchmark("preprocess_data")
+def _bench_preprocess():
+    from ai_engine.ModelUpdater import ModelUpdater
+    from ai_engine.StrategyGenerator import StrategyGenerator
+
+    data = _market_data(_fake())
+    gen = StrategyGenerator(ModelUpdater(tempfile.gettempdir()))
+    return lambda: gen._preprocess_data(data)
+
+
+@benchmark("strategy_predict")
+def _bench_predict():
+    data = _market_data(_fake())
+    gen = _strategy_generator(data)
+    return lambda: gen.predict(SYMBOL, data)
+
+
+@benchmark("forecast_cached")
+def _bench_forecast_cached():
+    """Repeated forecast on the same DataFeed bar; must be served from cache."""
+    from ai_engine.Architectures import build_architecture
+    from ai_engine.ForecastModule import ForecastModule
+    from ai_engine.ModelUpdater import ModelUpdater
+
+    fake = _fake()
+    from broker_interface.DataFeed import DataFeed
+    updater = ModelUpdater(tempfile.mkdtemp(prefix="bench-models-"))
+    updater.save_model(SYMBOL, build_architecture("linear", (30, 2)),
+                       metadata={"features": ["close", "volume"], "window_size": 30})
+    frame = DataFeed().get_ohlcv(SYMBOL, fake.TIMEFRAME_M1, 200)
+    forecaster = ForecastModule(updater)
+    first = forecaster.forecast(SYMBOL, frame, 5, timeframe=fake.TIMEFRAME_M1)
+    key = (SYMBOL, fake.TIMEFRAME_M1, frame["time"].iloc[-1])
+    assert len(first) == 5 and key in forecaster._cache, "forecast on a DataFeed frame was not cached"
+
+    def op():
+        assert forecaster.forecast(SYMBOL, frame, 5, timeframe=fake.TIMEFRAME_M1) == first
+    return op
+
+
+@benchmark("risk_evaluator")
+def _bench_risk():
+    from ai_engine.RiskEvaluator import RiskEvaluator
+
+    risk = RiskEvaluator(_load_config()["risk"])
+    strat = {"symbol": SYMBOL, "entry": 1.1, "stop_loss": 1.0978, "take_profit": 1.1044}
+
+    def op():
+        risk.calculate_position_size(equity=10000.0, stop_loss=0.0022, risk_pct=1.0)
+        risk.evaluate(strat)
+    return op
+
+
+@benchmark("performance_tracker")
+def _bench_tracker():
+    from core.PerformanceTracker import PerformanceTracker
+
+    pnl = np.random.default_rng(0).normal(0.0, 10.0, 10000).tolist()
+
+    def op():
+        tracker = PerformanceTracker()
+        for p in pnl:
+            tracker.record_trade(p)
+        tracker.get_total_pnl()
+        tracker.get_win_rate()
+        tracker.get_max_drawdown()
+    return op
+
+
+class WebhookStandIn:
+    """Local HTTP server accepting alert webhooks, with an artificial delay."""
+
+    def __init__(self, delay: float = 0.05) -> None:
+        received = self.received = []
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                time.sleep(delay)
+                received.append(json.loads(body))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/alerts"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@benchmark("alert_send")
+def _bench_alerts():
+    from core.AlertSystem import AlertSystem, LogSink, WebhookSink, HIGH, LOW
+
+    hook = WebhookStandIn()
+    alerts = AlertSystem(sinks=[LogSink(), WebhookSink(hook.url)])
+    counter = iter(range(1 << 62))
+
+    def op():
+        n = next(counter)
+        alerts.send(f"No trade signal for {SYMBOL}", LOW, key=f"no_signal:{SYMBOL}")
+        alerts.send(f"Executed trade #{n} on {SYMBOL}", HIGH)
+    return op
+
+
+@benchmark("run_cycle")
+def _bench_run_cycle():
+    fake = _fake()
+    from core.TradingEngine import TradingEngine
+
+    cfg = _load_config()
+    engine = TradingEngine(cfg, {"login": 0, "password": "", "server": "fake"})
+    engine.initialize()
+    engine.account.start()
+    engine.strategy_gen = _strategy_generator(_market_data(fake, cfg["strategy"]["bars"]))
+    bars = cfg["strategy"]["bars"]
+
+    def op():
+        fake.advance(1)
+        engine.run_cycle(SYMBOL, fake.TIMEFRAME_M1, bars)
+    return op
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+@benchmark("multi_timeframe_fetch")
+def _bench_multi_timeframe_fetch():
+    """
+    Incremental get_multi_timeframe. Setup walks the fake clock from
+    Wednesday noon past the weekend in uneven steps and checks every
+    timeframe against FakeMT5's own series at each step, including one
+    (H1) deeper than max_m1_bars that must be fetched directly.
+    """
+    fake = _fake()
+    import pandas as pd
+    from broker_interface.DataFeed import DataFeed
+
+    timeframes, bars = [fake.TIMEFRAME_M1, fake.TIMEFRAME_M5, fake.TIMEFRAME_M15, fake.TIMEFRAME_H1], 120
+    feed = DataFeed(max_m1_bars=15 * bars)
+    columns = ["time", "open", "high", "low", "close", "tick_volume"]
+    steps = [1, 3, 7, 14, 29, 61, 113] * 30  # ~4.75 days: Wednesday noon to Monday morning
+    start = fake.now
+    for step in [0] + steps:
+        fake.advance(step)
+        frames = feed.get_multi_timeframe(SYMBOL, timeframes, bars)
+        for tf in timeframes:
+            expected = pd.DataFrame(fake.copy_rates_from_pos(SYMBOL, tf, 0, bars))
+            expected["time"] = pd.to_datetime(expected["time"], unit="s")
+            got = frames[tf][columns].reset_index(drop=True)
+            pd.testing.assert_frame_equal(got, expected[columns], check_dtype=False,
+                                          obj=f"timeframe {tf} after +{step} min")
+    assert pd.Timestamp(fake.now, unit="s").dayofweek == 0 and fake.now - start > 4 * 86400
+
+    def op():
+        fake.advance(1)
+        feed.get_multi_timeframe(SYMBOL, timeframes, bars)
+    return op
+
+
+@benchmark("multi_timeframe_cycle")
+def _bench_multi_timeframe_cycle():
+    """The live loop's per-symbol path: one incremental M1 fetch, local resampling, one cycle per timeframe."""
+    fake = _fake()
+    from core.TradingEngine import TradingEngine
+
+    cfg = _load_config()
+    cfg["checkpoint"]["enabled"] = False
+    engine = TradingEngine(cfg, {"login": 0, "password": "", "server": "fake"})
+    engine.initialize()
+    engine.account.start()
+    engine.strategy_gen = _strategy_generator(_market_data(fake, cfg["strategy"]["bars"]))
+    timeframes, bars = cfg["strategy"]["timeframes"], cfg["strategy"]["bars"]
+
+    def op():
+        fake.advance(1)
+        frames = engine.data_feed.get_multi_timeframe(SYMBOL, timeframes, bars)
+        for tf in timeframes:
+            engine.run_cycle(SYMBOL, tf, bars, df=frames[tf])
+    return op
+
+
+class AlternatingStrategy:
+    """Buy on even minutes, Sell on odd ones: deterministic signals without a model."""
+
+    def predict(self, symbol: str, data: Dict[str, np.ndarray]) -> int:
+        return int(np.asarray(data["time"][-1]).astype("datetime64[m]").astype(np.int64) % 2)
+
+
+def _trading_session(engine, fake: FakeMT5, cycles: int) -> None:
+    """The live loop's per-symbol body, `cycles` times, one fake minute apart."""
+    timeframes, bars = engine.cfg["strategy"]["timeframes"], engine.cfg["strategy"]["bars"]
+    for _ in range(cycles):
+        if fake is not None:
+            fake.advance(1)
+            time.sleep(0.03)  # let the background refresher poll between trades
+        frames = engine.data_feed.get_multi_timeframe(SYMBOL, timeframes, bars)
+        for tf in timeframes:
+            engine.run_cycle(SYMBOL, tf, bars, df=frames[tf])
+
+
+@benchmark("replay_session")
+def _bench_replay_session():
+    """
+    Deterministic replay of a recorded session. Setup records a FakeMT5
+    session through TradingEngine (background refresher on), replays it at
+    full and 10x speed, and checks that every replayed order_send has the
+    recorded arguments and that every recorded call was consumed.
+    """
+    from broker_interface.SessionRecorder import RecordingMT5, ReplayMT5, read_log
+
+    fake = FakeMT5(seed=7, order_latency=0.002)
+    install_backend(fake)
+    fake.initialize()
+    from core.TradingEngine import TradingEngine
+    cfg = _load_config()
+    cfg["checkpoint"]["enabled"] = False
+    gen = AlternatingStrategy()
+    log = os.path.join(tempfile.mkdtemp(prefix="bench-replay-"), "session.rec")
+
+    recorder = RecordingMT5(fake, log)
+    install_backend(recorder)
+    engine = TradingEngine(dict(cfg, account={"refresh_interval": 0.01}),
+                           {"login": 0, "password": "", "server": "fake"})
+    engine.strategy_gen = gen
+    engine.initialize()
+    engine.account.start()
+    _trading_session(engine, fake, cycles=6)
+    engine.account.stop()
+    engine.alerts.close()
+    recorder.close()
+    recorded = [r[3] for r in list(read_log(log))[1:] if r[2] == "order_send"]
+    assert len({r[0]["volume"] for r in recorded}) > 1, "sizing never saw equity change"
+
+    def replay(speed):
+        backend = ReplayMT5(log, speed=speed)
+        install_backend(backend)
+        engine = TradingEngine(dict(cfg, account={"refresh_interval": 0}),
+                               {"login": 0, "password": "", "server": "replay"})
+        engine.strategy_gen = gen
+        engine.initialize()
+        engine.account.start()
+        _trading_session(engine, None, cycles=6)
+        engine.alerts.close()
+        return backend
+
+    for speed in (None, 10.0):
+        backend = replay(speed)
+        assert not backend.divergences and not backend.misses and not backend.remaining(), \
+            f"replay at speed {speed} diverged: {backend.divergences[:3]}, " \
+            f"{backend.misses} misses, {backend.remaining()} unused"
+    return lambda: replay(None)
+
+
+def host_info() -> Dict[str, Any]:
+    return {"cpu": _cpu_model(), "cpus": os.cpu_count(), "machine": platform.machine(),
+            "python": ".".join(platform.python_version_tuple()[:2])}
+
+
+def baseline_path(host: Dict[str, Any]) -> str:
+    """benchmarks/baselines/<cpu-model>-<cpus>cpu-py<python>.json"""
+    cpu = re.sub(r"[^a-z0-9]+", "-", host["cpu"].lower()).strip("-")
+    return os.path.join(BASELINE_DIR, f"{cpu}-{host['cpus']}cpu-py{host['python']}.json")
+
+
+def measure(setup: Callable[[], Callable[[], None]], rounds: int, min_time: float) -> float:
+    """Fastest per-call seconds over `rounds` rounds of the operation returned by `setup`."""
+    op = setup()
+    op()  # warm-up: lazy imports, graph tracing, caches
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+    samples = [elapsed / number]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        samples.append((time.perf_counter() - start) / number)
+    return min(samples)
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    regressions = []
+    for name, seconds in results.items():
+        ref = baseline.get(name)
+        if ref is None:
+            print(f"  {name:<22} {seconds * 1e6:12.1f} us   NO BASELINE")
+            continue
+        ratio = seconds / ref
+        flag = "REGRESSION" if ratio > 1.0 + tolerance else "ok"
+        print(f"  {name:<22} {seconds * 1e6:12.1f} us   baseline {ref * 1e6:12.1f} us   x{ratio:5.2f}  {flag}")
+        if flag != "ok":
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser("DeepSeek FX Pro benchmarks")
+    p.add_argument("--only", action="append", choices=sorted(BENCHMARKS),
+                   help="Run only the named benchmark (repeatable)")
+    p.add_argument("--baseline", default=None,
+                   help="Baseline JSON file (default: this host's file under benchmarks/baselines/)")
+    p.add_argument("--update-baseline", action="store_true",
+                   help="Write results to the baseline file instead of comparing")
+    p.add_argument("--tolerance", type=float, default=0.25,
+                   help="Allowed slowdown vs. baseline as a fraction (default 0.25)")
+    p.add_argument("--rounds", type=int, default=10)
+    p.add_argument("--min-time", type=float, default=0.2,
+                   help="Minimum seconds per timing round")
+    args = p.parse_args(argv)
+    args.baseline = args.baseline or baseline_path(host_info())
+
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+    logging.disable(logging.CRITICAL)
+    try:
+        import tensorflow as tf
+        tf.keras.utils.disable_interactive_logging()
+    except ImportError:
+        pass
+
+    results = {}
+    for name in args.only or sorted(BENCHMARKS):
+        results[name] = measure(BENCHMARKS[name], args.rounds, args.min_time)
+
+    if args.update_baseline:
+        recorded = {}
+        if args.only and os.path.exists(args.baseline):
+            # partial run: keep the other benchmarks' entries
+            with open(args.baseline, "r") as f:
+                recorded = json.load(f).get("results", {})
+        recorded.update(results)
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "host": host_info(),
+                "results": recorded,
+            }, f, indent=2, sort_keys=True)
+        for name, seconds in results.items():
+            print(f"  {name:<22} {seconds * 1e6:12.1f} us")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f).get("results", {})
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"Re-measuring {', '.join(regressions)}")
+        retry = {name: measure(BENCHMARKS[name], args.rounds, args.min_time) for name in regressions}
+        regressions = compare(retry, baseline, args.tolerance)
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        return 1
+    missing = [name for name in results if name not in baseline]
+    if missing:
+        print(f"NOT GATED: no baseline in {args.baseline} for {', '.join(missing)}. "
+              f"Record one on this host type with --update-baseline.")
+        return 3
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
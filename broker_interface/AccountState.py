@@ -0,0 +1,129 @@
+# broker_interface/AccountState.py
+"""
+Background account-state refresher.
+
+A daemon thread polls `account_info()` and `positions_get()` (one bulk call
+each) and publishes an immutable AccountSnapshot by plain attribute
+assignment. Readers on the trading path just read `service.snapshot`; they
+never wait on the broker or take a lock.
+
+With refresh_interval <= 0 there is no thread: every fresh_snapshot() call
+refreshes inline. Session replay uses this so that what position sizing sees
+depends only on the replayed calls, not on thread timing.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+import MetaTrader5 as mt5
+
+
+def setup_logger() -> logging.Logger:
+    logger = logging.getLogger("AccountState")
+    if not logger.handlers:
+        h = logging.StreamHandler()
+        h.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        logger.addHandler(h)
+        logger.setLevel(logging.INFO)
+    return logger
+
+
+@dataclass(frozen=True)
+class PositionState:
+    ticket: int
+    symbol: str
+    volume: float  # signed: > 0 long, < 0 short
+    price_open: float
+    profit: float
+
+
+@dataclass(frozen=True)
+class AccountSnapshot:
+    equity: float
+    balance: float
+    margin: float
+    free_margin: float
+    positions: Tuple[PositionState, ...]
+    net_positions: Mapping[str, float] = field(default_factory=lambda: MappingProxyType({}))
+    fetched_at: float = 0.0  # time.monotonic() when the broker answered
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def net_position(self, symbol: str) -> float:
+        return self.net_positions.get(symbol, 0.0)
+
+
+class AccountStateService:
+    def __init__(self, refresh_interval: float = 1.0, max_staleness: float = 5.0) -> None:
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+        self.snapshot: Optional[AccountSnapshot] = None
+        self.logger = setup_logger()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> Optional[AccountSnapshot]:
+        """Fetch account and positions from the broker and publish a snapshot."""
+        info = mt5.account_info()
+        positions = mt5.positions_get()
+        if info is None or positions is None:
+            self.logger.warning("Account refresh failed: %s", mt5.last_error())
+            return None
+
+        states = []
+        net = {}
+        for p in positions:
+            volume = p.volume if p.type == mt5.POSITION_TYPE_BUY else -p.volume
+            states.append(PositionState(p.ticket, p.symbol, volume, p.price_open, p.profit))
+            net[p.symbol] = net.get(p.symbol, 0.0) + volume
+
+        snapshot = AccountSnapshot(
+            equity=info.equity,
+            balance=info.balance,
+            margin=info.margin,
+            free_margin=info.margin_free,
+            positions=tuple(states),
+            net_positions=MappingProxyType(net),
+            fetched_at=time.monotonic(),
+        )
+        self.snapshot = snapshot  # single reference swap; readers see old or new
+        return snapshot
+
+    def fresh_snapshot(self) -> Optional[AccountSnapshot]:
+        """Latest snapshot, or None if there is none or it exceeds `max_staleness`."""
+        if self.refresh_interval <= 0:
+            return self.refresh()
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.age() > self.max_staleness:
+            return None
+        return snapshot
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.exception("Account refresh error: %s", e)
+
+    def start(self) -> None:
+        """Take one snapshot synchronously, then keep refreshing in the background."""
+        if self._thread is not None:
+            return
+        self.refresh()
+        if self.refresh_interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="AccountState", daemon=True)
+        self._thread.start()
+        self.logger.info("Account state refresher started (every %.1fs)", self.refresh_interval)
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=self.refresh_interval + 1.0)
+        self._thread = None
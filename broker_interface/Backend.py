@@ -0,0 +1,30 @@
+# broker_interface/Backend.py
+"""
+Swaps the `MetaTrader5` module used by the broker layer.
+
+Every broker module does `import MetaTrader5 as mt5` at import time. Installing
+a backend replaces `sys.modules["MetaTrader5"]` (for modules imported later)
+and rebinds `mt5` in the ones already imported, so stand-ins such as
+FakeMT5 can drive the unmodified engine.
+"""
+import sys
+from typing import Any
+
+BROKER_MODULES = (
+    "broker_interface.AccountState",
+    "broker_interface.MT5Controller",
+    "broker_interface.DataFeed",
+    "broker_interface.OrderManager",
+    "utils.mt5_data",
+)
+
+
+def install_backend(backend: Any) -> Any:
+    """Make `backend` the MetaTrader5 module. Returns the previous one (or None)."""
+    previous = sys.modules.get("MetaTrader5")
+    sys.modules["MetaTrader5"] = backend
+    for name in BROKER_MODULES:
+        module = sys.modules.get(name)
+        if module is not None and hasattr(module, "mt5"):
+            module.mt5 = backend
+    return previous
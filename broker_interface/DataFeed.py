@@ -4,19 +4,32 @@ Fetches market data from MetaTrader 5.
 """
 import logging
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 import pandas as pd
 import MetaTrader5 as mt5
 
+from utils.Resampler import IncrementalResampler
+from utils.timeframes import resampleable, timeframe_minutes
+
+
+# MT5's "max bars in chart" commonly defaults to 100k; longer requests are
+# silently truncated, so deeper timeframes are fetched directly instead.
+MAX_M1_BARS = 100_000
+
 
 class DataFeed:
-    def __init__(self) -> None:
+    def __init__(self, max_m1_bars: int = MAX_M1_BARS) -> None:
+        self.max_m1_bars = max_m1_bars
         self.logger = logging.getLogger("DataFeed")
         if not self.logger.handlers:
             handler = logging.StreamHandler()
             handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s: %(message)s"))
             self.logger.addHandler(handler)
             self.logger.setLevel(logging.INFO)
+        # per-symbol M1 cache and derived higher-timeframe series
+        self._m1: Dict[str, pd.DataFrame] = {}
+        self._resamplers: Dict[str, Dict[int, IncrementalResampler]] = {}
+        self._layout: Dict[str, Tuple[Tuple[int, ...], int]] = {}
 
     def get_ohlcv(self, symbol: str, timeframe: int, bars: int) -> Optional[pd.DataFrame]:
         data = mt5.copy_rates_from_pos(symbol, timeframe, 0, bars)
@@ -27,3 +40,95 @@ class DataFeed:
         df['time'] = pd.to_datetime(df['time'], unit='s')
         self.logger.info("Fetched %d bars for %s", len(df), symbol)
         return df
+
+    def state_dict(self) -> Dict[str, Any]:
+        """Cached M1 history per symbol, as compact record arrays."""
+        return {
+            symbol: {"layout": self._layout.get(symbol), "m1": df.to_records(index=False)}
+            for symbol, df in self._m1.items()
+        }
+
+    def load_state_dict(self, state: Dict[str, Any]) -> None:
+        """Restore the M1 cache and rebuild the derived timeframes from it."""
+        for symbol, entry in state.items():
+            m1 = pd.DataFrame(entry["m1"])
+            self._m1[symbol] = m1
+            if entry["layout"] is None:
+                continue
+            timeframes, bars = entry["layout"]
+            self._layout[symbol] = (tuple(timeframes), bars)
+            self._resamplers[symbol] = {
+                tf: IncrementalResampler(tf, max_bars=bars)
+                for tf in timeframes if timeframe_minutes(tf) > 1
+            }
+            for resampler in self._resamplers[symbol].values():
+                resampler.seed(m1)
+
+    def _fetch_m1_since(self, symbol: str, last_time: pd.Timestamp, depth: int) -> Optional[pd.DataFrame]:
+        """Fetch the newest M1 bars, widening the request until it overlaps `last_time`."""
+        count = 4
+        while True:
+            df = self.get_ohlcv(symbol, mt5.TIMEFRAME_M1, min(count, depth))
+            if df is None or count >= depth or df["time"].iloc[0] <= last_time:
+                return df
+            count *= 4
+
+    def get_multi_timeframe(self, symbol: str, timeframes: List[int], bars: int) -> Optional[Dict[int, pd.DataFrame]]:
+        """
+        Return `bars` bars of every timeframe from a single M1 series.
+
+        The first call fetches enough M1 history for the longest timeframe;
+        later calls fetch only the M1 bars added since, and the higher
+        timeframes are updated incrementally, so all of them stay consistent
+        with each other. Timeframes that cannot be resampled (W1, MN1), or
+        whose `bars` would need more than `max_m1_bars` M1 bars (e.g. H4 or
+        D1 at 500 bars), are fetched directly. None if no data is available.
+        """
+        local = [tf for tf in timeframes
+                 if resampleable(tf) and bars * timeframe_minutes(tf) <= self.max_m1_bars]
+        frames = self._resampled(symbol, local, bars) if local else {}
+        if frames is None:
+            return None
+        for tf in timeframes:
+            if tf not in frames:
+                frames[tf] = self.get_ohlcv(symbol, tf, bars)
+                if frames[tf] is None:
+                    return None
+        return {tf: frames[tf] for tf in timeframes}
+
+    def _resampled(self, symbol: str, timeframes: List[int], bars: int) -> Optional[Dict[int, pd.DataFrame]]:
+        key = (tuple(timeframes), bars)
+        depth = bars * max(timeframe_minutes(tf) for tf in timeframes)
+        cached = self._m1.get(symbol)
+
+        new = None
+        if cached is not None and self._layout.get(symbol) == key:
+            new = self._fetch_m1_since(symbol, cached["time"].iloc[-1], depth)
+            if new is None:
+                return None
+            if new["time"].iloc[0] > cached["time"].iloc[-1]:
+                cached = None  # gap longer than the window: start over
+            else:
+                m1 = pd.concat([cached[cached["time"] < new["time"].iloc[0]], new], ignore_index=True)
+                m1 = m1.tail(depth).reset_index(drop=True)
+                for resampler in self._resamplers[symbol].values():
+                    resampler.update(new)
+        if cached is None or self._layout.get(symbol) != key:
+            m1 = new if new is not None and len(new) >= depth else \
+                self.get_ohlcv(symbol, mt5.TIMEFRAME_M1, depth)
+            if m1 is None:
+                return None
+            self._resamplers[symbol] = {
+                tf: IncrementalResampler(tf, max_bars=bars)
+                for tf in timeframes if timeframe_minutes(tf) > 1
+            }
+            for resampler in self._resamplers[symbol].values():
+                resampler.seed(m1)
+            self._layout[symbol] = key
+        self._m1[symbol] = m1
+
+        frames = {}
+        for tf in timeframes:
+            resampler = self._resamplers[symbol].get(tf)
+            frames[tf] = m1.tail(bars).reset_index(drop=True) if resampler is None else resampler.bars
+        return frames
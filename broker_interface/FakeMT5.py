@@ -0,0 +1,329 @@
+# broker_interface/FakeMT5.py
+"""
+Deterministic in-process stand-in for the MetaTrader5 package.
+
+Serves synthetic M1-based rates (higher timeframes are aggregated from the
+same M1 series, with the weekend market closure), ticks, account info and
+positions, and accepts orders with configurable latency and requote rate.
+Intended for benchmarks and offline runs on hosts without an MT5 terminal:
+
+    from broker_interface.Backend import install_backend
+    from broker_interface.FakeMT5 import FakeMT5
+    install_backend(FakeMT5(seed=1))
+"""
+import threading
+import time
+import zlib
+from collections import namedtuple
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from utils.timeframes import timeframe_minutes
+
+# --- constants (values match the real MetaTrader5 package) -------------------
+TIMEFRAME_M1, TIMEFRAME_M2, TIMEFRAME_M3, TIMEFRAME_M4, TIMEFRAME_M5 = 1, 2, 3, 4, 5
+TIMEFRAME_M6, TIMEFRAME_M10, TIMEFRAME_M12, TIMEFRAME_M15 = 6, 10, 12, 15
+TIMEFRAME_M20, TIMEFRAME_M30 = 20, 30
+TIMEFRAME_H1, TIMEFRAME_H2, TIMEFRAME_H3, TIMEFRAME_H4 = 16385, 16386, 16387, 16388
+TIMEFRAME_H6, TIMEFRAME_H8, TIMEFRAME_H12 = 16390, 16392, 16396
+TIMEFRAME_D1 = 16408
+
+ORDER_TYPE_BUY, ORDER_TYPE_SELL = 0, 1
+POSITION_TYPE_BUY, POSITION_TYPE_SELL = 0, 1
+TRADE_ACTION_DEAL = 1
+ORDER_TIME_GTC = 0
+ORDER_FILLING_FOK, ORDER_FILLING_IOC, ORDER_FILLING_RETURN = 0, 1, 2
+
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_INVALID_VOLUME = 10014
+RES_S_OK = 1
+RES_E_INTERNAL_FAIL_INIT = -10005
+
+RATES_DTYPE = np.dtype([
+    ("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"),
+    ("close", "<f8"), ("tick_volume", "<u8"), ("spread", "<i4"), ("real_volume", "<u8"),
+])
+
+Tick = namedtuple("Tick", "time bid ask last volume time_msc flags volume_real")
+SymbolInfo = namedtuple("SymbolInfo", "name digits point trade_contract_size volume_min volume_max volume_step")
+AccountInfo = namedtuple("AccountInfo", "login balance equity profit margin margin_free margin_level leverage currency")
+TradePosition = namedtuple("TradePosition", "ticket time type magic volume price_open sl tp price_current profit symbol comment")
+OrderSendResult = namedtuple("OrderSendResult", "retcode deal order volume price bid ask comment request_id retcode_external request")
+
+# 2024-01-10 12:00 UTC, a Wednesday
+DEFAULT_NOW = 1704888000
+
+_BASE_PRICES = {"EURUSD": 1.08, "GBPUSD": 1.26, "USDJPY": 148.0, "XAUUSD": 2030.0}
+
+
+def trading_mask(times: np.ndarray) -> np.ndarray:
+    """True for minutes when the FX market is open (Sun 22:00 – Fri 22:00 UTC)."""
+    days = times // 86400
+    weekday = (days + 3) % 7  # 1970-01-01 was a Thursday; Monday == 0
+    minute_of_day = (times % 86400) // 60
+    closed = (
+        (weekday == 5)
+        | ((weekday == 6) & (minute_of_day < 22 * 60))
+        | ((weekday == 4) & (minute_of_day >= 22 * 60))
+    )
+    return ~closed
+
+
+def aggregate_rates(m1: np.ndarray, minutes: int) -> np.ndarray:
+    """Aggregate an M1 rates array into `minutes`-long bars aligned to the epoch."""
+    if minutes == 1 or len(m1) == 0:
+        return m1.copy()
+    buckets = m1["time"] // (minutes * 60)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(m1)] - 1
+    out = np.empty(len(starts), dtype=RATES_DTYPE)
+    out["time"] = buckets[starts] * minutes * 60
+    out["open"] = m1["open"][starts]
+    out["high"] = np.maximum.reduceat(m1["high"], starts)
+    out["low"] = np.minimum.reduceat(m1["low"], starts)
+    out["close"] = m1["close"][ends]
+    out["tick_volume"] = np.add.reduceat(m1["tick_volume"], starts)
+    out["spread"] = m1["spread"][ends]
+    out["real_volume"] = np.add.reduceat(m1["real_volume"], starts)
+    return out
+
+
+class _Series:
+    """Lazily extended M1 history for one symbol, reproducible from its seed."""
+
+    def __init__(self, symbol: str, seed: int, start: int, digits: int) -> None:
+        base = next((p for k, p in _BASE_PRICES.items() if symbol.startswith(k)), 1.0)
+        self.rng = np.random.default_rng([seed, zlib.crc32(symbol.encode())])
+        self.digits = digits
+        self.last_close = base
+        self.last_time = start - 60
+        self.rates = np.empty(0, dtype=RATES_DTYPE)
+
+    def extend_to(self, now: int) -> None:
+        first = self.last_time + 60
+        last = now - now % 60
+        if last < first:
+            return
+        times = np.arange(first, last + 60, 60, dtype=np.int64)
+        times = times[trading_mask(times)]
+        self.last_time = last
+        n = len(times)
+        if n == 0:
+            return
+        rets = self.rng.normal(0.0, 0.0001, n)
+        closes = self.last_close * np.exp(np.cumsum(rets))
+        opens = np.r_[self.last_close, closes[:-1]]
+        wick = np.abs(self.rng.normal(0.0, 0.00005, (2, n))) * opens
+        bars = np.empty(n, dtype=RATES_DTYPE)
+        bars["time"] = times
+        bars["open"] = np.round(opens, self.digits)
+        bars["close"] = np.round(closes, self.digits)
+        bars["high"] = np.round(np.maximum(opens, closes) + wick[0], self.digits)
+        bars["low"] = np.round(np.minimum(opens, closes) - wick[1], self.digits)
+        bars["tick_volume"] = self.rng.integers(1, 200, n)
+        bars["spread"] = self.rng.integers(5, 20, n)
+        bars["real_volume"] = 0
+        self.last_close = float(closes[-1])
+        self.rates = np.concatenate([self.rates, bars])
+
+
+class FakeMT5:
+    """
+    Drop-in replacement for the `MetaTrader5` module.
+
+    seed:          makes every symbol's price path reproducible
+    now:           server time (epoch seconds); advance with `advance()`
+    history_days:  how much M1 history exists before `now`
+    latency:       seconds slept on every data call
+    order_latency: seconds slept on every order_send
+    requote_rate:  probability that order_send returns TRADE_RETCODE_REQUOTE
+    """
+
+    def __init__(
+            self,
+            seed: int = 0,
+            now: int = DEFAULT_NOW,
+            history_days: int = 30,
+            latency: float = 0.0,
+            order_latency: float = 0.0,
+            requote_rate: float = 0.0,
+            balance: float = 10000.0,
+            leverage: int = 100,
+    ) -> None:
+        self.seed = seed
+        self.now = now
+        self.history_start = now - history_days * 86400
+        self.latency = latency
+        self.order_latency = order_latency
+        self.requote_rate = requote_rate
+        self.balance = balance
+        self.leverage = leverage
+        self.initialized = False
+        self.login = 0
+        self.calls: Dict[str, int] = {}
+        self._rng = np.random.default_rng(seed)
+        self._series: Dict[str, _Series] = {}
+        self._positions: Dict[int, Dict[str, Any]] = {}
+        self._ticket = 1000
+        self._error: Tuple[int, str] = (RES_S_OK, "Success")
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name: str) -> Any:
+        # expose module-level constants (TIMEFRAME_M1, ORDER_TYPE_BUY, ...)
+        value = globals().get(name)
+        if value is None or not name.isupper():
+            raise AttributeError(name)
+        return value
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | {k for k in globals() if k.isupper()})
+
+    # --- helpers ---------------------------------------------------------
+    def _enter(self, name: str, delay: float) -> bool:
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if delay > 0:
+            time.sleep(delay)
+        if not self.initialized:
+            self._error = (RES_E_INTERNAL_FAIL_INIT, "IPC initialize failed")
+            return False
+        return True
+
+    @staticmethod
+    def _digits(symbol: str) -> int:
+        if "JPY" in symbol:
+            return 3
+        if symbol.startswith("XAU"):
+            return 2
+        return 5
+
+    def _m1(self, symbol: str) -> np.ndarray:
+        series = self._series.get(symbol)
+        if series is None:
+            series = _Series(symbol, self.seed, self.history_start, self._digits(symbol))
+            self._series[symbol] = series
+        series.extend_to(self.now)
+        return series.rates
+
+    def _price(self, symbol: str) -> Tuple[float, float]:
+        m1 = self._m1(symbol)
+        bid = float(m1["close"][-1]) if len(m1) else 1.0
+        point = 10.0 ** -self._digits(symbol)
+        spread = int(m1["spread"][-1]) if len(m1) else 10
+        return bid, round(bid + spread * point, self._digits(symbol))
+
+    def advance(self, minutes: int = 1) -> None:
+        """Move the server clock forward; new bars appear on the next request."""
+        with self._lock:
+            self.now += minutes * 60
+
+    # --- terminal ----------------------------------------------------------
+    def initialize(self, path: Optional[str] = None, login: Optional[int] = None,
+                   password: Optional[str] = None, server: Optional[str] = None,
+                   **kwargs: Any) -> bool:
+        self.calls["initialize"] = self.calls.get("initialize", 0) + 1
+        self.initialized = True
+        self.login = login or 0
+        self._error = (RES_S_OK, "Success")
+        return True
+
+    def shutdown(self) -> None:
+        self.initialized = False
+
+    def last_error(self) -> Tuple[int, str]:
+        return self._error
+
+    # --- market data -------------------------------------------------------
+    def copy_rates_from_pos(self, symbol: str, timeframe: int, start_pos: int,
+                            count: int) -> Optional[np.ndarray]:
+        with self._lock:
+            if not self._enter("copy_rates_from_pos", self.latency):
+                return None
+            minutes = timeframe_minutes(timeframe)
+            m1 = self._m1(symbol)
+            need = (start_pos + count + 1) * minutes
+            tail = m1[-need:]
+            rates = aggregate_rates(tail, minutes)
+            if len(tail) < len(m1) and len(rates) > 1:
+                rates = rates[1:]  # first bucket may be cut by the slice
+            end = len(rates) - start_pos
+            return rates[max(0, end - count): max(0, end)].copy()
+
+    def symbol_info_tick(self, symbol: str) -> Optional[Tick]:
+        with self._lock:
+            if not self._enter("symbol_info_tick", self.latency):
+                return None
+            bid, ask = self._price(symbol)
+            return Tick(self.now, bid, ask, 0.0, 0, self.now * 1000, 6, 0.0)
+
+    def symbol_info(self, symbol: str) -> Optional[SymbolInfo]:
+        with self._lock:
+            if not self._enter("symbol_info", self.latency):
+                return None
+            digits = self._digits(symbol)
+            return SymbolInfo(symbol, digits, 10.0 ** -digits, 100000.0, 0.01, 100000.0, 0.01)
+
+    # --- account -----------------------------------------------------------
+    def _position_tuple(self, p: Dict[str, Any]) -> TradePosition:
+        bid, ask = self._price(p["symbol"])
+        current = bid if p["type"] == POSITION_TYPE_BUY else ask
+        sign = 1.0 if p["type"] == POSITION_TYPE_BUY else -1.0
+        profit = round(sign * (current - p["price_open"]) * p["volume"], 2)
+        return TradePosition(p["ticket"], p["time"], p["type"], p["magic"], p["volume"],
+                             p["price_open"], p["sl"], p["tp"], current, profit,
+                             p["symbol"], p["comment"])
+
+    def positions_get(self, symbol: Optional[str] = None, **kwargs: Any) -> Optional[Tuple[TradePosition, ...]]:
+        with self._lock:
+            if not self._enter("positions_get", self.latency):
+                return None
+            return tuple(self._position_tuple(p) for p in self._positions.values()
+                         if symbol is None or p["symbol"] == symbol)
+
+    def positions_total(self) -> int:
+        return len(self._positions)
+
+    def account_info(self) -> Optional[AccountInfo]:
+        with self._lock:
+            if not self._enter("account_info", self.latency):
+                return None
+            positions = [self._position_tuple(p) for p in self._positions.values()]
+            profit = round(sum(p.profit for p in positions), 2)
+            margin = round(sum(p.volume * p.price_open for p in positions) / self.leverage, 2)
+            equity = round(self.balance + profit, 2)
+            level = equity / margin * 100.0 if margin else 0.0
+            return AccountInfo(self.login, self.balance, equity, profit, margin,
+                               round(equity - margin, 2), level, self.leverage, "USD")
+
+    # --- trading -----------------------------------------------------------
+    def order_send(self, request: Dict[str, Any]) -> Optional[OrderSendResult]:
+        with self._lock:
+            if not self._enter("order_send", self.order_latency):
+                return None
+            symbol = request["symbol"]
+            volume = float(request.get("volume", 0.0))
+            bid, ask = self._price(symbol)
+            is_buy = request.get("type") == ORDER_TYPE_BUY
+            price = ask if is_buy else bid
+
+            if volume <= 0:
+                retcode, comment = TRADE_RETCODE_INVALID_VOLUME, "Invalid volume"
+            elif self.requote_rate and self._rng.random() < self.requote_rate:
+                retcode, comment = TRADE_RETCODE_REQUOTE, "Requote"
+            else:
+                retcode, comment = TRADE_RETCODE_DONE, "Request executed"
+
+            deal = order = 0
+            if retcode == TRADE_RETCODE_DONE:
+                self._ticket += 1
+                deal = order = self._ticket
+                self._positions[self._ticket] = {
+                    "ticket": self._ticket, "time": self.now, "symbol": symbol,
+                    "type": POSITION_TYPE_BUY if is_buy else POSITION_TYPE_SELL,
+                    "magic": request.get("magic", 0), "volume": volume,
+                    "price_open": price, "sl": request.get("sl", 0.0),
+                    "tp": request.get("tp", 0.0), "comment": request.get("comment", ""),
+                }
+            return OrderSendResult(retcode, deal, order, volume if deal else 0.0,
+                                   price, bid, ask, comment, 0, 0, dict(request))
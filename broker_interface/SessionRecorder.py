@@ -0,0 +1,281 @@
+# broker_interface/SessionRecorder.py
+"""
+Record and replay MetaTrader5 sessions.
+
+RecordingMT5 wraps the real module and appends every call (name, arguments,
+result, start offset, duration) to a compact binary log. ReplayMT5 serves
+those results back, either as fast as the engine asks (deterministic) or
+paced at N× the recorded wall-clock speed. Both are installed with
+broker_interface.Backend.install_backend, so DataFeed, OrderManager,
+MT5Controller and AccountState run unmodified.
+
+Log layout: MAGIC, then records of <uint32 length><pickle payload>. The first
+record holds the backend's constants; each later one is a tuple
+(offset, duration, name, args, kwargs, result). Passwords are never written.
+"""
+import collections
+import logging
+import pickle
+import struct
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"DSFXREC1"
+_LEN = struct.Struct("<I")
+_SCRUBBED = "***"
+
+# Polled account state: answered from the replay clock instead of consumed in
+# order, since how often it is polled depends on thread timing.
+STATE_CALLS = frozenset({"account_info", "positions_get", "positions_total"})
+# Matched on positional arguments only: replays run with dummy credentials.
+_CREDENTIAL_CALLS = frozenset({"initialize", "login"})
+
+
+def setup_logger() -> logging.Logger:
+    logger = logging.getLogger("SessionRecorder")
+    if not logger.handlers:
+        h = logging.StreamHandler()
+        h.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        logger.addHandler(h)
+        logger.setLevel(logging.INFO)
+    return logger
+
+
+class _NT:
+    """Picklable stand-in for the MT5 result structs (TradePosition, ...)."""
+    __slots__ = ("typename", "fields", "values")
+
+    def __init__(self, typename: str, fields: Tuple[str, ...], values: Tuple[Any, ...]) -> None:
+        self.typename = typename
+        self.fields = fields
+        self.values = values
+
+    def __reduce__(self):
+        return _NT, (self.typename, self.fields, self.values)
+
+    def __repr__(self) -> str:
+        return f"{self.typename}{self.values!r}"
+
+
+def _freeze(value: Any) -> Any:
+    """Convert broker results into plain picklable values."""
+    if hasattr(value, "_asdict"):
+        d = value._asdict()
+        return _NT(type(value).__name__, tuple(d), tuple(_freeze(v) for v in d.values()))
+    if isinstance(value, tuple):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, list):
+        return [_freeze(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _freeze(v) for k, v in value.items()}
+    return value
+
+
+_nt_types: Dict[Tuple[str, Tuple[str, ...]], type] = {}
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, _NT):
+        cls = _nt_types.get((value.typename, value.fields))
+        if cls is None:
+            cls = collections.namedtuple(value.typename, value.fields)
+            _nt_types[(value.typename, value.fields)] = cls
+        return cls(*(_thaw(v) for v in value.values))
+    if isinstance(value, tuple):
+        return tuple(_thaw(v) for v in value)
+    if isinstance(value, list):
+        return [_thaw(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _thaw(v) for k, v in value.items()}
+    return value
+
+
+def _scrub(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    if "password" in kwargs:
+        kwargs = dict(kwargs, password=_SCRUBBED)
+    return kwargs
+
+
+def read_log(path: str) -> Iterator[Any]:
+    """Yield the constants record, then every call record in the log."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session recording")
+        while True:
+            head = f.read(_LEN.size)
+            if len(head) < _LEN.size:
+                return  # clean EOF or a record cut short by a crash
+            (size,) = _LEN.unpack(head)
+            payload = f.read(size)
+            if len(payload) < size:
+                return
+            yield pickle.loads(payload)
+
+
+class RecordingMT5:
+    """Pass-through proxy for the MetaTrader5 module that logs every call."""
+
+    def __init__(self, backend: Any, path: str) -> None:
+        self._backend = backend
+        self._path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "wb", buffering=1 << 20)
+        self._origin = time.monotonic()
+        self.logger = setup_logger()
+        constants = {k: getattr(backend, k) for k in dir(backend)
+                     if k.isupper() and isinstance(getattr(backend, k), (int, float, str))}
+        self._file.write(MAGIC)
+        self._write(constants)
+        self.logger.info("Recording broker session to %s", path)
+
+    def _write(self, record: Any) -> None:
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._file.write(_LEN.pack(len(payload)))
+            self._file.write(payload)
+
+    def _wrap(self, name: str, func: Any) -> Any:
+        def call(*args: Any, **kwargs: Any) -> Any:
+            start = time.monotonic()
+            result = func(*args, **kwargs)
+            duration = time.monotonic() - start
+            self._write((start - self._origin, duration, name, _freeze(args),
+                         _freeze(_scrub(kwargs)), _freeze(result)))
+            return result
+        call.__name__ = name
+        return call
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._backend, name)
+        if callable(value) and not name.isupper() and not isinstance(value, type):
+            value = self._wrap(name, value)
+            setattr(self, name, value)  # cache: __getattr__ is not hit again
+        return value
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        self.logger.info("Broker session recording closed: %s", self._path)
+
+
+class ReplayMT5:
+    """
+    MetaTrader5 stand-in that answers from a RecordingMT5 log.
+
+    speed=None replays deterministically with no waiting; speed=N waits so
+    each call returns no earlier than its recorded offset divided by N.
+    A call is matched to the next unused record with the same name and
+    arguments, falling back to the next unused record with the same name,
+    so a changed engine can still be replayed against the same input; such
+    fallbacks are listed in `divergences` (name, args, recorded args).
+
+    Account-state calls (STATE_CALLS) are not consumed: they return the
+    latest recorded answer that had completed when the engine's next
+    recorded call started, i.e. the freshest state the engine could have
+    read at that point of the recording. What the engine sees therefore
+    depends only on its own progress through the log, at any speed.
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = None) -> None:
+        self.speed = speed
+        self.misses = 0
+        self.divergences: List[Tuple[str, Any, Any]] = []
+        self._cursor = 0  # first record that may still be unconsumed
+        self._state: Dict[Any, Tuple[List[float], List[int]]] = {}
+        self.logger = setup_logger()
+        records = read_log(path)
+        self._constants: Dict[str, Any] = next(records)
+        self._records: List[Tuple] = []
+        self._used: List[bool] = []
+        self._exact: Dict[Tuple[str, str], deque] = {}
+        self._by_name: Dict[str, deque] = {}
+        for i, (offset, duration, name, args, kwargs, result) in enumerate(records):
+            self._records.append((offset, duration, name, result, args))
+            key = self._key(args, {} if name in _CREDENTIAL_CALLS else kwargs)
+            if name in STATE_CALLS:
+                self._used.append(True)
+                for state_key in ((name, key), name):
+                    ends, idxs = self._state.setdefault(state_key, ([], []))
+                    ends.append(offset + duration)
+                    idxs.append(i)
+                continue
+            self._used.append(False)
+            self._exact.setdefault((name, key), deque()).append(i)
+            self._by_name.setdefault(name, deque()).append(i)
+        for ends, idxs in self._state.values():
+            order = sorted(range(len(ends)), key=ends.__getitem__)
+            ends[:] = [ends[j] for j in order]
+            idxs[:] = [idxs[j] for j in order]
+        self._lock = threading.Lock()
+        self._origin = time.monotonic()
+        self._funcs: Dict[str, Any] = {}
+        self.logger.info("Replaying %d broker calls from %s (speed %s)",
+                         len(self._records), path, speed or "deterministic")
+
+    @staticmethod
+    def _key(args: Any, kwargs: Dict[str, Any]) -> str:
+        return repr((args, sorted(kwargs.items())))
+
+    def _take(self, queue: Optional[deque]) -> Optional[int]:
+        while queue:
+            i = queue.popleft()
+            if not self._used[i]:
+                self._used[i] = True
+                return i
+        return None
+
+    def _state_answer(self, name: str, key: str) -> Optional[int]:
+        """Latest state record completed before the next sequenced call started (else the first)."""
+        entry = self._state.get((name, key)) or self._state.get(name)
+        if entry is None:
+            return None
+        while self._cursor < len(self._used) and self._used[self._cursor]:
+            self._cursor += 1
+        clock = self._records[self._cursor][0] if self._cursor < len(self._records) else float("inf")
+        ends, idxs = entry
+        return idxs[max(bisect_right(ends, clock) - 1, 0)]
+
+    def _answer(self, name: str, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        kwargs = {} if name in _CREDENTIAL_CALLS else _scrub(kwargs)
+        key = self._key(_freeze(args), _freeze(kwargs))
+        with self._lock:
+            if name in STATE_CALLS:
+                i = self._state_answer(name, key)
+                if i is not None:
+                    return _thaw(self._records[i][3])
+            else:
+                i = self._take(self._exact.get((name, key)))
+                if i is None:
+                    i = self._take(self._by_name.get(name))
+                    if i is not None:
+                        self.divergences.append((name, _freeze(args), self._records[i][4]))
+        if i is None:
+            self.misses += 1
+            self.logger.warning("No recorded response left for %s%s", name, args)
+            return None
+        offset, duration, _, result, _ = self._records[i]
+        if self.speed:
+            wait = (offset + duration) / self.speed - (time.monotonic() - self._origin)
+            if wait > 0:
+                time.sleep(wait)
+        return _thaw(result)
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self._constants:
+            return self._constants[name]
+        if name.startswith("_") or name.isupper():
+            raise AttributeError(name)
+        func = self._funcs.get(name)
+        if func is None:
+            def func(*args: Any, **kwargs: Any) -> Any:
+                return self._answer(name, args, kwargs)
+            self._funcs[name] = func
+        return func
+
+    def remaining(self) -> int:
+        """Recorded (non-state) calls not yet consumed by the replay."""
+        return self._used.count(False)
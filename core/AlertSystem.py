@@ -1,13 +1,230 @@
 # ---------- core/AlertSystem.py ----------
 """
 Sends real-time alerts and notifications.
+
+`send()` only enqueues; a dispatcher thread deduplicates, rate-limits and
+batches alerts, and each sink delivers from its own worker thread, so a slow
+webhook never blocks trading or the other sinks. Low-priority alerts are
+not deduplicated or rate-limited individually; every occurrence is counted
+into a periodic digest instead.
 """
+import json
 import logging
+import queue
+import threading
+import time
+import urllib.request
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 
+LOW, NORMAL, HIGH = 0, 1, 2
 
-class AlertSystem:
+_STOP = object()
+
+
+@dataclass(frozen=True)
+class Alert:
+    message: str
+    priority: int = NORMAL
+    key: Optional[str] = None  # groups alerts for rate limiting; defaults to message
+    created: float = field(default_factory=time.time)
+
+
+class AlertSink:
+    """Delivery channel. `deliver` runs on the sink's own worker thread."""
+
+    def deliver(self, alerts: List[Alert]) -> None:
+        raise NotImplementedError
+
+
+class LogSink(AlertSink):
     def __init__(self) -> None:
         self.logger = logging.getLogger("AlertSystem")
 
-    def send(self, message: str) -> None:
-        self.logger.info("ALERT: %s", message)
+    def deliver(self, alerts: List[Alert]) -> None:
+        for alert in alerts:
+            self.logger.info("ALERT: %s", alert.message)
+
+
+class WebhookSink(AlertSink):
+    """POSTs each batch as JSON: {"alerts": [{"message", "priority", "key", "time"}]}."""
+
+    def __init__(self, url: str, timeout: float = 5.0) -> None:
+        self.url = url
+        self.timeout = timeout
+
+    def deliver(self, alerts: List[Alert]) -> None:
+        body = json.dumps({"alerts": [
+            {"message": a.message, "priority": a.priority, "key": a.key, "time": a.created}
+            for a in alerts
+        ]}).encode("utf-8")
+        request = urllib.request.Request(
+            self.url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class _SinkWorker:
+    def __init__(self, sink: AlertSink, logger: logging.Logger) -> None:
+        self.sink = sink
+        self.logger = logger
+        self.queue: "queue.Queue[Any]" = queue.Queue()
+        self.thread = threading.Thread(
+            target=self._run, name=f"AlertSink-{type(sink).__name__}", daemon=True
+        )
+        self.thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self.queue.get()
+            stop = batch is _STOP
+            batch = [] if stop else list(batch)
+            # coalesce batches that queued up while the sink was busy
+            while not stop:
+                try:
+                    more = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is _STOP:
+                    stop = True
+                else:
+                    batch.extend(more)
+            if batch:
+                try:
+                    self.sink.deliver(batch)
+                except Exception as e:
+                    self.logger.error("Alert delivery via %s failed: %s", type(self.sink).__name__, e)
+            if stop:
+                return
+
+
+class AlertSystem:
+    def __init__(
+            self,
+            sinks: Optional[List[AlertSink]] = None,
+            dedup_window: float = 60.0,
+            rate_limit_per_minute: int = 6,
+            digest_interval: float = 300.0,
+            max_queue: int = 10000,
+    ) -> None:
+        """
+        dedup_window: seconds after delivering a message during which an
+            identical one is dropped
+        rate_limit_per_minute: max alerts per key per minute (HIGH is exempt)
+        digest_interval: seconds between digests of LOW alerts
+        """
+        self.logger = logging.getLogger("AlertSystem")
+        self.dedup_window = dedup_window
+        self.rate_limit_per_minute = rate_limit_per_minute
+        self.digest_interval = digest_interval
+        self.dropped = 0
+        self.suppressed = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._workers = [_SinkWorker(s, self.logger) for s in (sinks or [LogSink()])]
+        self._last_seen: Dict[str, float] = {}
+        self._recent: Dict[str, List[float]] = {}
+        self._digest: "Counter[str]" = Counter()
+        self._dispatcher = threading.Thread(target=self._dispatch, name="AlertDispatcher", daemon=True)
+        self._dispatcher.start()
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> "AlertSystem":
+        cfg = dict(cfg or {})
+        sinks: List[AlertSink] = [LogSink()]
+        url = cfg.pop("webhook_url", None)
+        if url:
+            sinks.append(WebhookSink(url, timeout=cfg.pop("webhook_timeout", 5.0)))
+        cfg.pop("webhook_timeout", None)
+        return cls(sinks=sinks, **cfg)
+
+    def send(self, message: str, priority: int = NORMAL, key: Optional[str] = None) -> None:
+        """Queue an alert; never blocks. Alerts are dropped if the queue is full."""
+        try:
+            self._queue.put_nowait(Alert(message, priority, key))
+        except queue.Full:
+            self.dropped += 1
+
+    # ----- dispatcher thread ---------------------------------------------
+    def _admit(self, alert: Alert, now: float) -> bool:
+        """
+        Deduplication (against the last delivery of the same message) and
+        per-key rate limiting; HIGH priority always passes.
+        """
+        if alert.priority >= HIGH:
+            return True
+        last = self._last_seen.get(alert.message)
+        if last is not None and now - last < self.dedup_window:
+            return False
+        key = alert.key or alert.message
+        recent = [t for t in self._recent.get(key, ()) if now - t < 60.0]
+        if len(recent) >= self.rate_limit_per_minute:
+            self._recent[key] = recent
+            return False
+        recent.append(now)
+        self._recent[key] = recent
+        self._last_seen[alert.message] = now
+        return True
+
+    def _flush_digest(self) -> None:
+        if not self._digest:
+            return
+        lines = [m if n == 1 else f"{m} (x{n})" for m, n in self._digest.items()]
+        total = sum(self._digest.values())
+        digest = Alert(f"Digest of {total} alerts: " + "; ".join(lines), LOW, "digest")
+        self._digest = Counter()
+        self._deliver([digest])
+
+    def _deliver(self, alerts: List[Alert]) -> None:
+        for worker in self._workers:
+            worker.queue.put(alerts)
+
+    def _dispatch(self) -> None:
+        next_digest = time.monotonic() + self.digest_interval
+        while True:
+            timeout = max(0.0, next_digest - time.monotonic())
+            try:
+                first = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                first = None
+
+            # drain whatever else is already queued into the same batch
+            items = [] if first is None else [first]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(item is _STOP for item in items)
+            now = time.monotonic()
+            immediate = []
+            for alert in items:
+                if alert is _STOP:
+                    continue
+                if alert.priority <= LOW:
+                    self._digest[alert.message] += 1
+                elif not self._admit(alert, now):
+                    self.suppressed += 1
+                else:
+                    immediate.append(alert)
+            if immediate:
+                self._deliver(immediate)
+
+            if stop or now >= next_digest:
+                self._flush_digest()
+                next_digest = now + self.digest_interval
+            if stop:
+                for worker in self._workers:
+                    worker.queue.put(_STOP)
+                return
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush pending alerts and the digest, then stop all worker threads."""
+        if not self._dispatcher.is_alive():
+            return
+        self._queue.put(_STOP, timeout=timeout)
+        self._dispatcher.join(timeout)
+        for worker in self._workers:
+            worker.thread.join(timeout)
@@ -3,7 +3,7 @@
 Monitors PnL, drawdown, and win rate.
 """
 import logging
-from typing import List
+from typing import Any, Dict, List
 
 
 class PerformanceTracker:
@@ -15,6 +15,12 @@ class PerformanceTracker:
         self.trades.append(pnl)
         self.logger.info("Recorded trade PnL: %.2f", pnl)
 
+    def state_dict(self) -> Dict[str, Any]:
+        return {"trades": list(self.trades)}
+
+    def load_state_dict(self, state: Dict[str, Any]) -> None:
+        self.trades = list(state.get("trades", []))
+
     def get_total_pnl(self) -> float:
         return sum(self.trades)
 
@@ -3,17 +3,46 @@
 Tracks asset allocation, balances, and exposure.
 """
 import logging
-from typing import Dict
+import time
+from typing import Any, Dict, Mapping, Tuple
 
 
 class PortfolioManager:
     def __init__(self) -> None:
         self.positions: Dict[str, float] = {}
+        self.updated_at = 0.0
         self.logger = logging.getLogger("PortfolioManager")
 
     def update_position(self, symbol: str, volume: float) -> None:
         self.positions[symbol] = self.positions.get(symbol, 0.0) + volume
+        self.updated_at = time.monotonic()
         self.logger.info("Updated position for %s: %.2f", symbol, self.positions[symbol])
 
     def get_position(self, symbol: str) -> float:
         return self.positions.get(symbol, 0.0)
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {"positions": dict(self.positions)}
+
+    def load_state_dict(self, state: Dict[str, Any]) -> None:
+        self.positions = dict(state.get("positions", {}))
+
+    def reconcile(self, broker_positions: Mapping[str, float], as_of: float) -> Dict[str, Tuple[float, float]]:
+        """
+        Align local positions with the broker's net positions observed at
+        monotonic time `as_of`. Snapshots older than the last local update are
+        ignored, since they cannot reflect that fill yet.
+        Returns {symbol: (local, broker)} for every corrected symbol.
+        """
+        if as_of < self.updated_at:
+            return {}
+        diffs = {}
+        for symbol in set(self.positions) | set(broker_positions):
+            local = self.positions.get(symbol, 0.0)
+            broker = broker_positions.get(symbol, 0.0)
+            if abs(local - broker) > 1e-9:
+                diffs[symbol] = (local, broker)
+                self.positions[symbol] = broker
+        if diffs:
+            self.logger.warning("Reconciled positions with broker: %s", diffs)
+        return diffs
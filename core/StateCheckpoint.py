@@ -0,0 +1,184 @@
+# ---------- core/StateCheckpoint.py ----------
+"""
+Periodic, atomic snapshots of engine state for warm restarts.
+
+Each component exposes state_dict()/load_state_dict(). Every top-level entry
+of a component's state is one section, pickled and stored content-addressed:
+
+    checkpoints/manifest.json            {section: {file, sha256, nbytes}}
+    checkpoints/<section>-<sha12>.bin    pickle payload
+
+A save rewrites only the sections whose bytes changed (so the trade log or a
+restored scaler is not rewritten every cycle) and commits by swapping the
+manifest with os.replace(). Capturing state happens on the caller's thread
+and is cheap; pickling, hashing and writing run on a background thread.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from utils.atomic_io import atomic_write_bytes
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+class CheckpointManager:
+    def __init__(self, components: Dict[str, Any], path: str = "checkpoints",
+                 interval: float = 30.0) -> None:
+        """
+        components: name -> object with state_dict()/load_state_dict()
+        path: checkpoint directory
+        interval: minimum seconds between periodic saves
+        """
+        self.components = components
+        self.path = path
+        self.interval = interval
+        self.logger = logging.getLogger("StateCheckpoint")
+        self._last_save = time.monotonic()
+        self._worker: Optional[threading.Thread] = None
+        self._written: Dict[str, Dict[str, Any]] = {}  # section -> manifest entry
+        os.makedirs(path, exist_ok=True)
+
+    def _capture(self) -> Dict[str, Any]:
+        sections = {}
+        for name, component in self.components.items():
+            for part, value in component.state_dict().items():
+                sections[f"{name}.{part}"] = value
+        return sections
+
+    def _write(self, sections: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        entries = {}
+        written = 0
+        for section, value in sections.items():
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            digest = hashlib.sha256(payload).hexdigest()
+            previous = self._written.get(section)
+            if previous is not None and previous["sha256"] == digest:
+                entries[section] = previous
+                continue
+            filename = f"{section}-{digest[:12]}.bin"
+            target = os.path.join(self.path, filename)
+            if not os.path.exists(target):
+                atomic_write_bytes(target, payload)
+                written += 1
+            entries[section] = {"file": filename, "sha256": digest, "nbytes": len(payload)}
+
+        manifest = {"format_version": FORMAT_VERSION, "created_at": time.time(), "sections": entries}
+        atomic_write_bytes(os.path.join(self.path, MANIFEST_NAME),
+                           json.dumps(manifest, indent=1).encode("utf-8"))
+        self._written = entries
+
+        live = {e["file"] for e in entries.values()} | {MANIFEST_NAME}
+        for name in os.listdir(self.path):
+            if name.endswith(".bin") and name not in live:
+                try:
+                    os.unlink(os.path.join(self.path, name))
+                except OSError:
+                    pass
+        self.logger.info("Checkpoint saved: %d/%d sections written in %.1f ms",
+                         written, len(entries), (time.perf_counter() - started) * 1e3)
+
+    def _write_safely(self, sections: Dict[str, Any]) -> None:
+        try:
+            self._write(sections)
+        except Exception as e:
+            self.logger.exception("Checkpoint write failed: %s", e)
+
+    def save(self, wait: bool = False) -> None:
+        """Capture state now and write it in the background (or inline with `wait`)."""
+        if self._worker is not None and self._worker.is_alive():
+            if not wait:
+                return  # previous snapshot still being written
+            self._worker.join()
+        sections = self._capture()
+        self._last_save = time.monotonic()
+        if wait:
+            self._write_safely(sections)
+            return
+        self._worker = threading.Thread(target=self._write_safely, args=(sections,),
+                                        name="StateCheckpoint", daemon=True)
+        self._worker.start()
+
+    def maybe_save(self) -> None:
+        """Save if at least `interval` seconds passed since the last snapshot."""
+        if time.monotonic() - self._last_save >= self.interval:
+            self.save()
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        """Read and decode the latest snapshot; None if there is none. Raises if it is damaged."""
+        try:
+            with open(os.path.join(self.path, MANIFEST_NAME), "rb") as f:
+                manifest = json.loads(f.read())
+        except FileNotFoundError:
+            return None
+        if manifest.get("format_version") != FORMAT_VERSION:
+            self.logger.warning("Ignoring checkpoint with format %s", manifest.get("format_version"))
+            return None
+
+        states: Dict[str, Dict[str, Any]] = {}
+        for section, entry in manifest["sections"].items():
+            with open(os.path.join(self.path, entry["file"]), "rb") as f:
+                payload = f.read()
+            if hashlib.sha256(payload).hexdigest() != entry["sha256"]:
+                raise ValueError(f"section {section} does not match its sha256")
+            name, part = section.split(".", 1)
+            states.setdefault(name, {})[part] = pickle.loads(payload)
+        return {"manifest": manifest, "states": states}
+
+    def _quarantine(self) -> None:
+        """Move a damaged checkpoint directory aside and start an empty one."""
+        target = base = f"{self.path}.corrupt-{time.strftime('%Y%m%d-%H%M%S')}"
+        n = 1
+        while os.path.exists(target):
+            target, n = f"{base}-{n}", n + 1
+        try:
+            os.replace(self.path, target)
+            self.logger.error("Moved damaged checkpoint to %s", target)
+        except OSError as e:
+            self.logger.error("Could not move damaged checkpoint %s aside: %s", self.path, e)
+        os.makedirs(self.path, exist_ok=True)
+        self._written = {}
+
+    def restore(self) -> bool:
+        """
+        Load the latest snapshot into the components. Returns False if there
+        is none, or if it is damaged (missing or corrupt section, invalid
+        manifest, unpickling or load_state_dict error): the error is logged,
+        components already loaded are reloaded with the state they had
+        before, and the directory is moved aside so the engine cold-starts.
+        Every section is decoded before any component is touched.
+        """
+        started = time.perf_counter()
+        previous: Dict[str, Dict[str, Any]] = {}
+        try:
+            loaded = self._load()
+            if loaded is None:
+                return False
+            for name, state in loaded["states"].items():
+                component = self.components.get(name)
+                if component is not None:
+                    previous[name] = component.state_dict()
+                    component.load_state_dict(state)
+        except Exception as e:
+            self.logger.exception("Checkpoint in %s is unusable, cold-starting: %s", self.path, e)
+            for name, state in previous.items():
+                try:
+                    self.components[name].load_state_dict(state)
+                except Exception as rollback_error:
+                    self.logger.error("Could not roll back %s: %s", name, rollback_error)
+            self._quarantine()
+            return False
+
+        manifest = loaded["manifest"]
+        self._written = dict(manifest["sections"])
+        self.logger.info("Restored checkpoint from %s (age %.0fs) in %.1f ms", self.path,
+                         time.time() - manifest.get("created_at", time.time()),
+                         (time.perf_counter() - started) * 1e3)
+        return True
@@ -7,13 +7,15 @@ from typing import Dict, Any
 from broker_interface.MT5Controller import MT5Controller
 from broker_interface.DataFeed import DataFeed
 from broker_interface.OrderManager import OrderManager
+from broker_interface.AccountState import AccountStateService
 from core.OrderExecutor import OrderExecutor
 from ai_engine.ModelUpdater import ModelUpdater
 from ai_engine.StrategyGenerator import StrategyGenerator
 from ai_engine.RiskEvaluator import RiskEvaluator
 from core.PortfolioManager import PortfolioManager
 from core.PerformanceTracker import PerformanceTracker
-from core.AlertSystem import AlertSystem
+from core.AlertSystem import AlertSystem, LOW, NORMAL, HIGH
+from core.StateCheckpoint import CheckpointManager
 
 class TradingEngine:
     def __init__(self, cfg: Dict[str, Any], creds: Dict[str, Any]):
@@ -24,12 +26,13 @@ class TradingEngine:
         # Broker & data interfaces
         self.mt5       = MT5Controller()
         self.data_feed = DataFeed()
+        self.account   = AccountStateService(**cfg.get('account', {}))
 
         # Execution & portfolio
         self.executor  = OrderExecutor(OrderManager())
         self.portfolio = PortfolioManager()
         self.tracker   = PerformanceTracker()
-        self.alerts    = AlertSystem()
+        self.alerts    = AlertSystem.from_config(cfg.get('alerts', {}))
 
         # Risk evaluator
         self.risk_eval = RiskEvaluator(cfg['risk'])
@@ -37,7 +40,21 @@ class TradingEngine:
         # Model & strategy generator
         os.makedirs(cfg['model']['path'], exist_ok=True)
         updater = ModelUpdater(save_dir=cfg['model']['path'])
-        self.strategy_gen = StrategyGenerator(model_updater=updater)
+        self.strategy_gen = StrategyGenerator(
+            model_updater=updater,
+            architecture=cfg['model'].get('architecture', 'lstm_deep'),
+            latency_budget_ms=cfg['model'].get('latency_budget_ms'),
+            candidates=cfg['model'].get('candidates'),
+        )
+
+        # Warm-restart snapshots of in-memory state
+        ckpt = cfg.get('checkpoint', {})
+        self.checkpoints = CheckpointManager(
+            {"portfolio": self.portfolio, "tracker": self.tracker,
+             "strategy": self.strategy_gen, "data_feed": self.data_feed},
+            path=ckpt.get('path', 'checkpoints'),
+            interval=ckpt.get('interval', 30.0)
+        ) if ckpt.get('enabled', False) else None
 
         # Store config and credentials
         self.cfg   = cfg
@@ -51,26 +68,48 @@ class TradingEngine:
             server=self.creds["server"]
         )
 
-    def run_cycle(self, symbol: str, timeframe: int, bars: int):
-        """Fetch data, generate/trade on strategy, and update performance."""
-        df = self.data_feed.get_ohlcv(symbol, timeframe, bars)
+    def run_cycle(self, symbol: str, timeframe: int, bars: int, df=None):
+        """Fetch data (unless `df` is given), generate/trade on strategy, and update performance."""
+        if df is None:
+            df = self.data_feed.get_ohlcv(symbol, timeframe, bars)
         if df is None:
             return
 
         # Build feature arrays for both training and prediction
         data = {
             "close":     df["close"].to_numpy(),
-            "volume":    df["tick_volume"].to_numpy()
+            "volume":    df["tick_volume"].to_numpy(),
+            "time":      df["time"].to_numpy()
         }
 
         # Generate prediction (lazy trains if missing)
         action = self.strategy_gen.predict(symbol, data)
+        self._act_on_signal(symbol, action, float(data["close"][-1]))
+
+    def run_fused_cycle(self, symbol: str, timeframes: list, bars: int):
+        """One fetch and one fused prediction covering all timeframes of `symbol`."""
+        frames = self.data_feed.get_multi_timeframe(symbol, timeframes, bars)
+        if frames is None:
+            return
+
+        data_by_tf = {
+            tf: {
+                "close":  df["close"].to_numpy(),
+                "volume": df["tick_volume"].to_numpy(),
+                "time":   df["time"].to_numpy()
+            }
+            for tf, df in frames.items()
+        }
+        action = self.strategy_gen.predict_fused(symbol, data_by_tf)
+        self._act_on_signal(symbol, action, float(data_by_tf[min(data_by_tf)]["close"][-1]))
+
+    def _act_on_signal(self, symbol: str, action, last_price: float):
+        """Size, risk-check and execute a Buy/Sell decision; Hold/None is a no-op."""
         if action is None or action == 2:   # 2 == Hold / no trade
-            self.alerts.send(f"No trade signal for {symbol}")
+            self.alerts.send(f"No trade signal for {symbol}", LOW, key=f"no_signal:{symbol}")
             return
 
         # Compute entry, stop-loss and take-profit from config
-        last_price = float(data["close"][-1])
         sl_pct = self.cfg['strategy']['stop_loss_pct']
         tp_pct = self.cfg['strategy']['take_profit_pct']
 
@@ -80,11 +119,21 @@ class TradingEngine:
             "symbol":     symbol,
             "entry":      last_price,
             "stop_loss":  sl,
-            "take_profit":tp
+            "take_profit":tp,
+            # keys read by OrderExecutor.execute
+            "action":     action,
+            "price":      last_price,
+            "sl":         sl,
+            "tp":         tp
         }
 
-        # Position sizing
-        equity   = 10000.0   # replace with real equity query if available
+        # Position sizing from the background account snapshot (no broker call here)
+        account = self.account.fresh_snapshot()
+        if account is None:
+            self.alerts.send(f"Account state stale; skipping trade on {symbol}", NORMAL, key="account_stale")
+            return
+        self.portfolio.reconcile(account.net_positions, account.fetched_at)
+        equity   = account.equity
         risk_pct = self.cfg['risk']['risk_pct']
 
         strat["volume"] = self.risk_eval.calculate_position_size(
@@ -96,26 +145,57 @@ class TradingEngine:
         # Final risk check and execution
         if self.risk_eval.evaluate(strat):
             self.executor.execute(strat)
-            self.portfolio.update_position(symbol, strat["volume"])
+            # signed like the broker's net positions: shorts are negative
+            signed = -strat["volume"] if action == 1 else strat["volume"]
+            self.portfolio.update_position(symbol, signed)
             self.tracker.record_trade(0.0)
-            self.alerts.send(f"Executed trade on {symbol}")
+            self.alerts.send(f"Executed trade on {symbol}", HIGH)
         else:
-            self.alerts.send(f"Trade for {symbol} vetoed by risk")
+            self.alerts.send(f"Trade for {symbol} vetoed by risk", LOW, key=f"veto:{symbol}")
 
     def run(self, mode: str = 'live', symbols: list = None):
         """Main dispatch: initialize, then run cycles for each symbol/timeframe."""
+        if self.checkpoints is not None:
+            self.checkpoints.restore()
         if not self.initialize():
             logging.error("Broker connection failed. Exiting.")
             return
+        self.account.start()
 
         syms = symbols or self.cfg['strategy']['symbols']
         tfs  = self.cfg['strategy']['timeframes']
         bars = self.cfg['strategy']['bars']
 
         logging.info("Starting %s mode for symbols: %s", mode, syms)
-        for sym in syms:
-            for tf in tfs:
+        try:
+            for sym in syms:
+                if self.cfg['strategy'].get('fused'):
+                    try:
+                        self.run_fused_cycle(sym, tfs, bars)
+                    except Exception as e:
+                        logging.exception("Error in fused cycle %s: %s", sym, e)
+                    self._maybe_checkpoint()
+                    continue
+                # one M1 fetch per symbol; higher timeframes are resampled locally
                 try:
-                    self.run_cycle(sym, tf, bars)
+                    frames = self.data_feed.get_multi_timeframe(sym, tfs, bars)
                 except Exception as e:
-                    logging.exception("Error in cycle %s@%d: %s", sym, tf, e)
+                    logging.exception("Error fetching data for %s: %s", sym, e)
+                    continue
+                if frames is None:
+                    continue
+                for tf in tfs:
+                    try:
+                        self.run_cycle(sym, tf, bars, df=frames[tf])
+                    except Exception as e:
+                        logging.exception("Error in cycle %s@%d: %s", sym, tf, e)
+                self._maybe_checkpoint()
+        finally:
+            if self.checkpoints is not None:
+                self.checkpoints.save(wait=True)
+            self.account.stop()
+            self.alerts.close()
+
+    def _maybe_checkpoint(self):
+        if self.checkpoints is not None:
+            self.checkpoints.maybe_save()
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 import os, argparse, yaml, logging
-from core.TradingEngine import TradingEngine
+from broker_interface.Backend import install_backend
 from utils.SecurityModule import SecurityManager, load_credentials
 
 def load_config(path="config/config.yaml") -> dict:
@@ -17,6 +17,12 @@ def parse_args():
                    help='Trading mode')
     p.add_argument('--symbols', type=str,
                    help='Comma‑separated list of symbols (overrides config)')
+    p.add_argument('--record', type=str, metavar='PATH',
+                   help='Record every MetaTrader5 call of this session to PATH')
+    p.add_argument('--replay', type=str, metavar='PATH',
+                   help='Replay a recorded session instead of connecting to MT5')
+    p.add_argument('--replay_speed', type=float, default=None,
+                   help='Replay at N× recorded speed (default: deterministic, no waiting)')
     return p.parse_args()
 
 def main():
@@ -44,8 +50,27 @@ def main():
         print("Encrypted credentials to", cfg['security']['credentials_file'])
         return
 
-    # 3) Live or backtest run
-    # 3.1 Load credentials
+    # 3) Replay of a recorded session (no terminal or credentials needed)
+    if args.replay:
+        from broker_interface.SessionRecorder import ReplayMT5
+        replay = ReplayMT5(args.replay, speed=args.replay_speed)
+        install_backend(replay)
+        from core.TradingEngine import TradingEngine
+        syms = [s.strip() for s in args.symbols.split(',')] if args.symbols else None
+        # a replay must neither start from nor overwrite the live warm-restart state,
+        # and account state is read inline so sizing does not depend on thread timing
+        cfg = dict(cfg, checkpoint=dict(cfg.get('checkpoint') or {}, enabled=False),
+                   account=dict(cfg.get('account') or {}, refresh_interval=0))
+        engine = TradingEngine(cfg, {"login": 0, "password": "", "server": "replay"})
+        engine.run(mode=args.mode, symbols=syms)
+        logging.info("Replay finished: %d calls unused, %d unmatched, %d diverged",
+                     replay.remaining(), replay.misses, len(replay.divergences))
+        for name, call_args, recorded in replay.divergences[:10]:
+            logging.warning("Diverged %s%s (recorded %s)", name, call_args, recorded)
+        return
+
+    # 4) Live or backtest run
+    # 4.1 Load credentials
     try:
         creds = load_credentials(
             path=cfg['security']['credentials_file'],
@@ -55,15 +80,26 @@ def main():
         logging.error("Failed to load credentials: %s", e)
         return
 
-    # 3.2 Determine symbols
+    # 4.2 Determine symbols
     if args.mode == 'live' and args.symbols:
         syms = [s.strip() for s in args.symbols.split(',')]
     else:
         syms = cfg['strategy']['symbols']
 
-    # 3.3 Initialize & run
+    # 4.3 Initialize & run
+    recorder = None
+    if args.record:
+        import MetaTrader5
+        from broker_interface.SessionRecorder import RecordingMT5
+        recorder = RecordingMT5(MetaTrader5, args.record)
+        install_backend(recorder)
+    from core.TradingEngine import TradingEngine
     engine = TradingEngine(cfg, creds)
-    engine.run(mode=args.mode, symbols=syms)
+    try:
+        engine.run(mode=args.mode, symbols=syms)
+    finally:
+        if recorder is not None:
+            recorder.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,98 @@
+# ---------- utils/Resampler.py ----------
+"""
+Derives higher-timeframe OHLCV bars from M1 bars.
+
+Bars are bucketed by flooring the bar time to the timeframe length, which
+matches MT5's alignment for intraday timeframes that divide a day and for
+D1 (bar times are in server time). Only buckets that contain at least one
+M1 bar produce a bar, so weekends and session breaks leave gaps exactly like
+the broker's own series, and a bucket cut short by a break still closes
+with the last M1 bar it saw.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.timeframes import timeframe_minutes, to_epoch_seconds
+
+COLUMNS = ["time", "open", "high", "low", "close", "tick_volume", "spread", "real_volume"]
+
+
+def resample_ohlcv(m1: pd.DataFrame, timeframe: int) -> pd.DataFrame:
+    """Aggregate an M1 frame (as returned by DataFeed.get_ohlcv) into `timeframe` bars."""
+    minutes = timeframe_minutes(timeframe)
+    if minutes == 1 or len(m1) == 0:
+        return m1.reset_index(drop=True)
+
+    seconds = minutes * 60
+    buckets = to_epoch_seconds(m1["time"].to_numpy()) // seconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(m1)] - 1
+
+    out = {
+        "time": pd.to_datetime(buckets[starts] * seconds, unit="s"),
+        "open": m1["open"].to_numpy()[starts],
+        "high": np.maximum.reduceat(m1["high"].to_numpy(), starts),
+        "low": np.minimum.reduceat(m1["low"].to_numpy(), starts),
+        "close": m1["close"].to_numpy()[ends],
+    }
+    for col in ("tick_volume", "real_volume"):
+        if col in m1:
+            out[col] = np.add.reduceat(m1[col].to_numpy(), starts)
+    if "spread" in m1:
+        out["spread"] = m1["spread"].to_numpy()[ends]
+    return pd.DataFrame(out, columns=[c for c in COLUMNS if c in out])
+
+
+class IncrementalResampler:
+    """
+    Keeps one higher-timeframe series up to date from streaming M1 bars.
+
+    Completed bars are never recomputed; only the M1 bars of the last
+    (still forming) bucket are kept and re-aggregated on each update, so a
+    re-sent M1 bar replaces its earlier version instead of double counting.
+    """
+
+    def __init__(self, timeframe: int, max_bars: int = 5000) -> None:
+        self.timeframe = timeframe
+        self.seconds = timeframe_minutes(timeframe) * 60
+        self.max_bars = max_bars
+        self.bars = pd.DataFrame(columns=COLUMNS)
+        self._pending: Optional[pd.DataFrame] = None  # M1 rows of the forming bucket
+
+    def seed(self, m1: pd.DataFrame) -> pd.DataFrame:
+        """Start from a full M1 history; a leading partial bucket is discarded."""
+        bars = resample_ohlcv(m1, self.timeframe)
+        if len(m1) and len(bars) > 1 and to_epoch_seconds(m1["time"].iloc[:1].to_numpy())[0] % self.seconds:
+            bars = bars.iloc[1:]
+        self.bars = bars.tail(self.max_bars).reset_index(drop=True)
+        self._pending = self._tail_bucket(m1)
+        return self.bars
+
+    def _tail_bucket(self, m1: pd.DataFrame) -> pd.DataFrame:
+        if len(m1) == 0:
+            return m1
+        times = to_epoch_seconds(m1["time"].to_numpy())
+        start = times[-1] - times[-1] % self.seconds
+        return m1[times >= start]
+
+    def update(self, new_m1: pd.DataFrame) -> pd.DataFrame:
+        """Fold new (or re-sent) M1 bars in; returns the updated bar series."""
+        if len(new_m1) == 0:
+            return self.bars
+        if self._pending is None:
+            return self.seed(new_m1)
+
+        rows = pd.concat([self._pending, new_m1], ignore_index=True)
+        rows = rows.drop_duplicates("time", keep="last").sort_values("time", kind="stable")
+        fresh = resample_ohlcv(rows, self.timeframe)
+
+        kept = self.bars
+        if len(self._pending) and len(kept):
+            kept = kept.iloc[:-1]  # the forming bar is rebuilt from `rows`
+        if len(kept):
+            fresh = fresh[fresh["time"] > kept["time"].iloc[-1]]
+        self.bars = pd.concat([kept, fresh], ignore_index=True).tail(self.max_bars).reset_index(drop=True)
+        self._pending = self._tail_bucket(rows)
+        return self.bars
@@ -0,0 +1,22 @@
+# ---------- utils/atomic_io.py ----------
+"""
+Crash-safe file writes.
+"""
+import os
+import tempfile
+
+
+def atomic_write_bytes(path: str, payload: bytes) -> None:
+    """Write `payload` to `path` so readers see either the old or the new file, never a mix."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
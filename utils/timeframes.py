@@ -0,0 +1,42 @@
+# ---------- utils/timeframes.py ----------
+"""
+Helpers for MetaTrader 5 TIMEFRAME_* constants.
+"""
+import numpy as np
+
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H12 = 16396
+TIMEFRAME_D1 = 16408
+TIMEFRAME_W1 = 32769
+TIMEFRAME_MN1 = 49153
+
+
+def timeframe_minutes(timeframe: int) -> int:
+    """Bar length in minutes for an MT5 TIMEFRAME_* constant."""
+    if 0 < timeframe <= TIMEFRAME_M30:
+        return timeframe
+    if timeframe == TIMEFRAME_D1:
+        return 1440
+    if TIMEFRAME_H1 <= timeframe <= TIMEFRAME_H12:
+        return (timeframe - 16384) * 60
+    if timeframe == TIMEFRAME_W1:
+        return 7 * 1440
+    raise ValueError(f"Unsupported timeframe {timeframe}")
+
+
+def resampleable(timeframe: int) -> bool:
+    """
+    True if bars of `timeframe` are fixed-length epoch buckets that can be
+    built from M1 by flooring times. Weekly bars start on the broker's week
+    boundary and monthly bars vary in length, so those must be fetched.
+    """
+    return timeframe not in (TIMEFRAME_W1, TIMEFRAME_MN1) and timeframe_minutes(timeframe) > 0
+
+
+def to_epoch_seconds(times) -> np.ndarray:
+    """Bar times (datetime64 of any unit, or epoch seconds) as int64 seconds."""
+    arr = np.asarray(times)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        return arr.astype("datetime64[s]").astype(np.int64)
+    return arr.astype(np.int64)